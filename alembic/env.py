@@ -9,6 +9,8 @@ from app.models.meal import Meal
 from app.models.allergy import Allergy
 from app.models.blacklisted_token import BlacklistedToken
 from app.models.allergen_mapping import AllergenMapping
+from app.models.meal_allergen_features import MealAllergenFeatures
+from app.models.user_meal_set import UserMealSet
 
 
 
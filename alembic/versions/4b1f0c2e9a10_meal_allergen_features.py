@@ -0,0 +1,34 @@
+"""Meal allergen features
+
+Revision ID: 4b1f0c2e9a10
+Revises: d6737a103c81
+Create Date: 2026-10-17 16:05:12.114302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1f0c2e9a10'
+down_revision: Union[str, None] = 'd6737a103c81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('meal_allergen_features',
+    sa.Column('meal_id', sa.Integer(), nullable=False),
+    sa.Column('allergens', postgresql.ARRAY(sa.String()), nullable=False),
+    sa.Column('ingredients_hash', sa.String(length=40), nullable=False),
+    sa.Column('mapping_version', sa.String(length=50), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['meal_id'], ['meals.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('meal_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('meal_allergen_features')
@@ -0,0 +1,78 @@
+"""Compact per-user meal sets replace user_meals
+
+Revision ID: 7c3e5d21b8f4
+Revises: 4b1f0c2e9a10
+Create Date: 2026-10-17 18:42:37.508116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e5d21b8f4'
+down_revision: Union[str, None] = '4b1f0c2e9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_meal_sets',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('meal_ids', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('date_shown', sa.Date(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Backfill from the denormalized rows, keeping their insertion order
+    op.execute("""
+        INSERT INTO user_meal_sets (user_id, meal_ids, date_shown, updated_at)
+        SELECT user_id, array_agg(meal_id ORDER BY id), max(date_shown), now()
+        FROM user_meals
+        WHERE user_id IS NOT NULL AND meal_id IS NOT NULL
+        GROUP BY user_id
+    """)
+    op.drop_index(op.f('ix_user_meals_id'), table_name='user_meals')
+    op.drop_table('user_meals')
+
+
+def downgrade() -> None:
+    op.create_table('user_meals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('meal_id', sa.Integer(), nullable=True),
+    sa.Column('date_shown', sa.Date(), nullable=True),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('total_calories', sa.Float(), nullable=True),
+    sa.Column('fats', sa.Float(), nullable=True),
+    sa.Column('carbs', sa.Float(), nullable=True),
+    sa.Column('protein', sa.Float(), nullable=True),
+    sa.Column('instruction', sa.Text(), nullable=False),
+    sa.Column('diet_type', postgresql.ARRAY(sa.String()), nullable=True),
+    sa.Column('meal_difficulty', sa.String(length=50), nullable=True),
+    sa.Column('meal_cooking_time', sa.String(length=50), nullable=True),
+    sa.Column('meal_cooking_method', postgresql.ARRAY(sa.String()), nullable=False),
+    sa.Column('country_origin', sa.String(length=100), nullable=True),
+    sa.Column('ingredients', postgresql.ARRAY(sa.String()), nullable=False),
+    sa.Column('meal_type', sa.String(length=50), nullable=True),
+    sa.ForeignKeyConstraint(['meal_id'], ['meals.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_meals_id'), 'user_meals', ['id'], unique=False)
+    op.execute("""
+        INSERT INTO user_meals (user_id, meal_id, date_shown, name, total_calories, fats, carbs, protein,
+                                instruction, diet_type, meal_difficulty, meal_cooking_time, meal_cooking_method,
+                                country_origin, ingredients, meal_type)
+        SELECT s.user_id, m.id, s.date_shown, m.name, m.total_calories, m.fats, m.carbs, m.protein,
+               m.instruction, m.diet_type, m.meal_difficulty, m.meal_cooking_time, m.meal_cooking_method,
+               m.country_origin, m.ingredients, m.meal_type
+        FROM user_meal_sets s
+        CROSS JOIN LATERAL unnest(s.meal_ids) WITH ORDINALITY AS u(meal_id, position)
+        JOIN meals m ON m.id = u.meal_id
+        ORDER BY s.user_id, u.position
+    """)
+    op.drop_table('user_meal_sets')
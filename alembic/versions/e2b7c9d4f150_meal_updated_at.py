@@ -0,0 +1,43 @@
+"""Meal updated_at and the meal version each feature row was built from
+
+Revision ID: e2b7c9d4f150
+Revises: 7c3e5d21b8f4
+Create Date: 2026-10-18 10:12:44.530918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c9d4f150'
+down_revision: Union[str, None] = '7c3e5d21b8f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('meals', sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False))
+    op.add_column('meal_allergen_features', sa.Column('meal_updated_at', sa.DateTime(), nullable=True))
+
+    # Bump updated_at on every UPDATE, including ones that bypass the ORM
+    op.execute("""
+        CREATE FUNCTION meals_touch_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = clock_timestamp();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER meals_touch_updated_at BEFORE UPDATE ON meals
+        FOR EACH ROW EXECUTE FUNCTION meals_touch_updated_at()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER meals_touch_updated_at ON meals")
+    op.execute("DROP FUNCTION meals_touch_updated_at()")
+    op.drop_column('meal_allergen_features', 'meal_updated_at')
+    op.drop_column('meals', 'updated_at')
@@ -27,7 +27,6 @@ from app.core.security import (
 from app.core.email import send_verification_email, send_password_reset_email
 from app.core.oauth import oauth
 from app.core.cache import redis_client
-from app.models.user_meals import UserMeal
 from app.utils.calorie_calculator import calculate_calories
 
 load_dotenv()
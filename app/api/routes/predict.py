@@ -1,5 +1,6 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from datetime import date
@@ -7,10 +8,16 @@ from app.core.db import get_db
 from app.models import meal
 from app.models.user import User
 from app.models.meal import Meal
-from app.models.user_meals import UserMeal
-from app.schemas.predict import MealDetailResponse, MealItem, MealSearchResult, PredictionResponse
-from app.services.model_loader import get_model_only
+from app.models.user_meal_set import UserMealSet
+from app.schemas.predict import MealDetailResponse, MealSearchResult, ModelInfoResponse, PredictionResponse
+from app.logic.ranking import meal_targets, rank_rows
+from app.services.catalog import get_meal_catalog
+from app.services.model_loader import get_model_only, model_registry
+from app.services.regeneration import regeneration_queue
+from app.services.search import get_ingredient_index, get_search_index, tokenize
 from app.utils.helpers import calculate_age
+from app.utils.pagination import NEXT_CURSOR_HEADER, cursor_scope, decode_cursor, encode_cursor, page_size
+from app.utils.responses import json_list_response, meal_fragments, meal_item, meal_search_result
 from app.utils.calorie_calculator import get_daily_calories
 from app.schemas.request import PredictRequest
 
@@ -22,62 +29,35 @@ def predict_meals(data: PredictRequest, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    shown_meals = db.query(UserMeal).filter(UserMeal.user_id == data.user_id).all()
-    if not shown_meals:
-        raise HTTPException(status_code=404, detail="No meals stored for user.")
-
-    # ---------- FILTER HELPERS ----------
-    def matches_meal_cooking_time(meal):
-        if not data.meal_cooking_time:
-            return True
-        try:
-            meal_time = int("".join(filter(str.isdigit, str(meal.meal_cooking_time))))
-            return meal_time <= int(data.meal_cooking_time)
-        except:
-            return False
-
-    def excludes_ingredients(meal):
-        if not data.excluded_ingredients:
-            return True
-        ingredients = [i.lower().strip() for i in (meal.ingredients or [])]
-        return all(excl.lower().strip() not in ingredients for excl in data.excluded_ingredients)
-
-    def matches_meal_type(meal):
-        if not data.meal_type:
-            return True
-        return meal.meal_type and meal.meal_type.strip().lower() == data.meal_type.strip().lower()
-
-    def matches_meal_cooking_method(meal):
-        if not data.meal_cooking_method:
-            return True
-        return (
-            meal.meal_cooking_method and
-            any(
-                method in [m.strip().lower() for m in meal.meal_cooking_method]
-                for method in data.meal_cooking_method
-            )
-        )
-
-    def matches_diet_type(meal):
-        if not data.diet_type:
-            return True
-        return (
-            meal.diet_type and
-            any(dt.lower().strip() == data.diet_type.lower().strip() for dt in meal.diet_type)
+    # Never serve a set computed for an older allergy/diet profile
+    if not user.meals_initialized:
+        job_id = regeneration_queue.ensure_job(user.id)
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Meals are being regenerated", "regeneration_job_id": job_id}
         )
 
-    # ---------- APPLY FILTERS ----------
-    filtered = [
-        m for m in shown_meals
-        if matches_meal_cooking_time(m)
-        and excludes_ingredients(m)
-        and matches_meal_type(m)
-        and matches_meal_cooking_method(m)
-        and matches_diet_type(m)
-    ]
+    meal_ids = db.query(UserMealSet.meal_ids).filter(UserMealSet.user_id == data.user_id).scalar()
+    if not meal_ids:
+        raise HTTPException(status_code=404, detail="No meals stored for user.")
 
-    if data.limit:
-        filtered = filtered[:data.limit]
+    # ---------- FILTERS (vectorized over the in-memory catalog) ----------
+    catalog = get_meal_catalog(db)
+    try:
+        max_minutes = int(data.meal_cooking_time) if data.meal_cooking_time else None
+    except ValueError:
+        # An unparseable bound matches nothing, as it always has
+        max_minutes = -1
+
+    mask = catalog.membership(meal_ids) & catalog.mask(
+        meal_type=data.meal_type,
+        diet_type=data.diet_type,
+        cooking_methods=data.meal_cooking_method,
+        max_cooking_minutes=max_minutes,
+        excluded_ingredients=data.excluded_ingredients,
+        min_calories=data.min_calories,
+        max_calories=data.max_calories,
+    )
 
     # ---------- CALCULATE MACROS ----------
     age = calculate_age(user.birthdate)
@@ -90,90 +70,83 @@ def predict_meals(data: PredictRequest, db: Session = Depends(get_db)):
         user.goal
     )
 
+    # ---------- RANK & PAGINATE ----------
+    targets = meal_targets(daily_cals, p, c, f, data.meals_per_day)
+    # A cursor only resumes the same user, filters, sort and targets it was issued for
+    scope = cursor_scope("predict", data.model_dump(exclude={"cursor", "limit"}), targets.tolist())
+    after = decode_cursor(data.cursor, scope, types=((int, float), int))
+    limit = page_size(data.limit)
+    # One extra row tells us whether another page exists
+    rows, scores = rank_rows(catalog, np.flatnonzero(mask), data.sort_by, data.descending, targets, limit + 1, after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows, scores = rows[:limit], scores[:limit]
+        next_cursor = encode_cursor((float(scores[-1]), int(catalog.ids[rows[-1]])), scope)
+    filtered = [catalog.meals[i] for i in rows]
+
     # ---------- RESPONSE ----------
-    return {
-        "daily_calories": daily_cals,
-        "macros": {
-            "protein": p,
-            "carbs": c,
-            "fats": f
+    return json_list_response(
+        filtered,
+        encode=meal_fragments.encoder(catalog.version, "meal_item", meal_item),
+        envelope={
+            "daily_calories": daily_cals,
+            "macros": {
+                "protein": p,
+                "carbs": c,
+                "fats": f
+            },
+            "next_cursor": next_cursor
         },
-        "recommended_meals": [
-            MealItem(
-                id=m.meal_id,
-                name=m.name,
-                instruction=m.instruction,
-                calories=m.total_calories,
-                protein=m.protein,
-                carbs=m.carbs,
-                fats=m.fats,
-                diet_type=m.diet_type,
-                difficulty=m.meal_difficulty,
-                meal_cooking_time=m.meal_cooking_time,
-                meal_cooking_method=m.meal_cooking_method,
-                cooking_method=m.meal_cooking_method,
-                origin=m.country_origin,
-                meal_type=m.meal_type,
-                ingredients=", ".join(m.ingredients) if m.ingredients else ""
-            )
-            for m in filtered
-        ]
-    }
-
+        key="recommended_meals"
+    )
 
 
 @router.get("/meal/{meal_id}", response_model=MealDetailResponse)
 def get_meal_detail(meal_id: int, db: Session = Depends(get_db)):
-    meal = db.query(Meal).filter(Meal.id == meal_id).first()
+    catalog = get_meal_catalog(db)
+    meal = catalog.record(meal_id)
     if not meal:
         raise HTTPException(status_code=404, detail="Meal not found")
 
-    return MealDetailResponse(
-        id=meal.id,
-        name=meal.name,
-        ingredients=", ".join(meal.ingredients) if meal.ingredients else "",
-        instruction=meal.instruction,
-        calories=meal.total_calories,
-        fats=meal.fats,
-        carbs=meal.carbs,
-        protein=meal.protein,
-        diet_type=meal.diet_type,
-        difficulty=meal.meal_difficulty,
-        meal_cooking_time=meal.meal_cooking_time,
-        meal_cooking_method=meal.meal_cooking_method,
-        origin=meal.country_origin,
-        meal_type=meal.meal_type
-    )
+    # MealDetailResponse has the same fields as MealItem, so the list fragment is reused
+    return Response(meal_fragments.encoder(catalog.version, "meal_item", meal_item)(meal), media_type="application/json")
 
 
 @router.get("/search", response_model=List[MealSearchResult])
-def search_meals(query: str = Query(..., min_length=2), db: Session = Depends(get_db)):
-    meals = db.query(Meal).filter(
-        Meal.name.ilike(f"%{query}%") |
-        Meal.country_origin.ilike(f"%{query}%") |
-        Meal.instruction.ilike(f"%{query}%")
-    ).all()
-    return [meal.__dict__ for meal in meals]
+def search_meals(
+    query: str = Query(..., min_length=2),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    index = get_search_index(db)
+    scope = "search:" + " ".join(tokenize(query))
+    after = decode_cursor(cursor, scope, types=((int, float), int))
+    limit = page_size(limit)
 
+    rows, scores = index.search(query, limit + 1, after)
+    headers = {}
+    if len(rows) > limit:
+        rows, scores = rows[:limit], scores[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor((float(scores[-1]), int(index.catalog.ids[rows[-1]])), scope)
 
+    encode = meal_fragments.encoder(index.catalog.version, "meal_search_result", meal_search_result)
+    return json_list_response((index.catalog.meals[i] for i in rows), encode=encode, headers=headers)
 
-#------------ auto complete ----------
-@router.get("/ingredients/suggest")
-def suggest_ingredients(query: str, db: Session = Depends(get_db)):
-    # Fetch all distinct ingredients from meals
-    all_ingredients = db.query(Meal.ingredients).all()
-
-    # Flatten and normalize all ingredients
-    unique_ingredients = set(
-        ing.strip().lower()
-        for row in all_ingredients
-        for ing in (row[0] or [])
-    )
 
-    # Filter ingredients that match the query prefix
-    suggestions = [
-        ing for ing in unique_ingredients
-        if ing.startswith(query.strip().lower())
-    ]
 
-    return {"suggestions": sorted(suggestions)}
\ No newline at end of file
+#------------ auto complete ----------
+@router.get("/ingredients/suggest")
+def suggest_ingredients(query: str, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    # Served from the prebuilt prefix index, most popular ingredients first
+    return {"suggestions": get_ingredient_index(db).suggest(query, limit)}
+
+
+#------------ model info ----------
+@router.get("/model", response_model=ModelInfoResponse)
+def get_model_info():
+    try:
+        loaded = model_registry.get()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Model not available")
+    return ModelInfoResponse(version=loaded.version, loaded_at=loaded.loaded_at)
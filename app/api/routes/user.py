@@ -1,5 +1,5 @@
 import json
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from sqlalchemy.orm import Session
@@ -13,20 +13,20 @@ from app.models.meal import Meal
 from app.models.user_daily_consumption import UserDailyConsumption
 from app.models.user_favorite_meals import UserFavoriteMeal
 from app.schemas.consumption import ConsumeMealRequest, DailyConsumptionResponse, MessageResponse
-from app.schemas.user import FavoriteMeal, FavoriteToggleRequest, ToggleFavoriteResponse, UserProfile, UserResponse
+from app.schemas.user import FavoriteMeal, FavoriteToggleRequest, RegenerationStatusResponse, ToggleFavoriteResponse, UserProfile, UserResponse
 from app.core.security import SECRET_KEY, get_current_user
-from app.services.model_loader import get_model_only
-from app.utils.allergen_csv_loader import load_allergen_mapping_from_csv
+from app.services.catalog import get_meal_catalog
+from app.services.regeneration import invalidate_meal_set, regeneration_queue
 from app.utils.calorie_calculator import calculate_calories
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, page_size
+from app.utils.responses import json_list_response, meal_fragments, meal_item
 from app.core.cache import redis_client
 
 
 from app.utils.helpers import calculate_age
 from app.models.meal import Meal
-from app.models.user_meals import UserMeal
 from datetime import date
 
-from app.logic.predictor import predict_safe_meals
 
 
 router = APIRouter(tags=["User"])
@@ -107,61 +107,17 @@ def update_health_form(data: UserProfile, request: Request, db: Session = Depend
     if not user.info_gathered_init:
         user.info_gathered_init = True
 
+    # The stored set was computed for the old profile: drop it in the same transaction as the change
+    invalidate_meal_set(db, user)
     db.commit()
     db.refresh(user)
 
-    db.query(UserMeal).filter(UserMeal.user_id == user.id).delete()
-
-    models = get_model_only()
-    allergen_mapping = load_allergen_mapping_from_csv()
+    # Meals are regenerated in the background; clients poll the job or watch meals_initialized
+    job_id = regeneration_queue.submit(user.id)
 
     if not user.birthdate:
         raise HTTPException(status_code=400, detail="Birthdate is required to calculate age")
 
-    user_input = {
-        "allergies": user.allergies or [],
-        "diet": user.preferred_diet or [],
-        "age": calculate_age(user.birthdate),
-        "gender": user.gender,
-        "weight": user.weight,
-        "height": user.height,
-        "activity": user.activity_level,
-        "goal": user.goal
-    }
-
-    meals = db.query(Meal).all()
-    safe_meals = predict_safe_meals(models, allergen_mapping, meals, user_input)
-
-    def matches_diet(meal):
-        return not user_input["diet"] or any(d in (meal.diet_type or []) for d in user_input["diet"])
-
-    safe_meals = [meal for meal in safe_meals if matches_diet(meal)]
-
-    for meal in safe_meals:
-        db.add(UserMeal(
-            user_id=user.id,
-            meal_id=meal.id,
-            date_shown=date.today(),
-            name=meal.name,
-            total_calories=meal.total_calories,
-            fats=meal.fats,
-            carbs=meal.carbs,
-            protein=meal.protein,
-            instruction=meal.instruction,
-            diet_type=meal.diet_type,
-            meal_difficulty=meal.meal_difficulty,
-            meal_cooking_time=meal.meal_cooking_time,
-            meal_cooking_method=meal.meal_cooking_method,
-            country_origin=meal.country_origin,
-            ingredients=meal.ingredients,
-            meal_type=meal.meal_type
-        ))
-
-    user.meals_initialized = True
-    db.commit()
-
-    print(f"Stored {len(safe_meals)} safe & diet-compatible meals for {user.email}")
-
     daily_cals, p, c, f = calculate_calories(user)
 
     try:
@@ -177,11 +133,18 @@ def update_health_form(data: UserProfile, request: Request, db: Session = Depend
             "carbs": c,
             "fats": f
         },
-        "meals_generated": len(safe_meals)
+        "regeneration_job_id": job_id
     }
 
 
-
+# ----------- GET /user/regeneration/{job_id} ------------
+@router.get("/regeneration/{job_id}", response_model=RegenerationStatusResponse)
+def get_regeneration_status(job_id: str, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    job = regeneration_queue.status(job_id)
+    user = db.query(User).filter(User.email == current_user.get("email")).first()
+    if not job or not user or job["user_id"] != user.id:
+        raise HTTPException(status_code=404, detail="Regeneration job not found")
+    return job
 
 
 # ----------- POST /user/profile ------------
@@ -256,37 +219,31 @@ def toggle_favorite(data: FavoriteToggleRequest, db: Session = Depends(get_db)):
 
 # ----------- GET /user/favorites ------------
 @router.get("/favorites", response_model=List[FavoriteMeal])
-def get_favorite_meals(user_id: int, db: Session = Depends(get_db)):
+def get_favorite_meals(
+    user_id: int,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    meals = (
-        db.query(Meal)
-        .join(UserFavoriteMeal, Meal.id == UserFavoriteMeal.meal_id)
-        .filter(UserFavoriteMeal.user_id == user_id)
-        .all()
-    )
-
-    return [
-        FavoriteMeal(
-            id=meal.id,
-            name=meal.name,
-            instruction=meal.instruction,
-            calories=meal.total_calories,
-            fats=meal.fats,
-            carbs=meal.carbs,
-            protein=meal.protein,
-            diet_type=meal.diet_type,
-            difficulty=meal.meal_difficulty,
-            meal_cooking_time=meal.meal_cooking_time,
-            cooking_method=meal.meal_cooking_method,
-            origin=meal.country_origin,
-            meal_type=meal.meal_type,
-            ingredients=", ".join(meal.ingredients) if meal.ingredients else ""
-        )
-        for meal in meals
-    ]
+    after = decode_cursor(cursor, "favorites")
+    limit = page_size(limit)
+    query = db.query(UserFavoriteMeal.meal_id).filter(UserFavoriteMeal.user_id == user_id)
+    if after:
+        query = query.filter(UserFavoriteMeal.meal_id > after[0])
+    meal_ids = [meal_id for (meal_id,) in query.order_by(UserFavoriteMeal.meal_id).limit(limit + 1)]
+    headers = {}
+    if len(meal_ids) > limit:
+        meal_ids = meal_ids[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor((meal_ids[-1],), "favorites")
+
+    # Favorites store ids only; meal records and their encoded JSON come from the catalog
+    catalog = get_meal_catalog(db)
+    meals = [meal for meal in (catalog.record(meal_id) for meal_id in meal_ids) if meal is not None]
+    return json_list_response(meals, encode=meal_fragments.encoder(catalog.version, "meal_item", meal_item), headers=headers)
 
 
 #------------------------ user consume ---------- 
@@ -0,0 +1,127 @@
+import copy
+import pickle
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import recall_score
+
+from app.logic.multilabel import MultiLabelModels
+
+DEFAULT_RECALL_TOLERANCE = 0.01
+# Recall alone would accept a model that flags everything; cap how far the false-positive rate may rise
+DEFAULT_FPR_TOLERANCE = 0.02
+TREE_COUNTS = (10, 25, 50, 100)
+MAX_DEPTHS = (4, 6, 8, 12)
+
+
+def artifact_size(model):
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def per_row_latency(model, X, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X)
+        best = min(best, time.perf_counter() - start)
+    return best / max(len(X), 1)
+
+
+def min_recall(y_true, y_pred):
+    # Safety is bounded by the worst allergen, so multi-label models are judged on their weakest output
+    y_true = np.asarray(y_true).astype(int)
+    y_pred = np.asarray(y_pred).astype(int)
+    if y_true.ndim == 1:
+        return recall_score(y_true, y_pred, zero_division=1)
+    return min(recall_score(y_true[:, i], y_pred[:, i], zero_division=1) for i in range(y_true.shape[1]))
+
+
+def max_false_positive_rate(y_true, y_pred):
+    y_true = np.asarray(y_true).astype(int).reshape(len(y_true), -1)
+    y_pred = np.asarray(y_pred).astype(int).reshape(len(y_pred), -1)
+    negatives = (y_true == 0).sum(axis=0)
+    false_positives = ((y_pred == 1) & (y_true == 0)).sum(axis=0)
+    return float(np.max(np.where(negatives > 0, false_positives / np.maximum(negatives, 1), 0.0)))
+
+
+def guard_metrics(y_true, y_pred):
+    return min_recall(y_true, y_pred), max_false_positive_rate(y_true, y_pred)
+
+
+def truncate_forest(clf, n_trees):
+    smaller = copy.copy(clf)
+    smaller.estimators_ = clf.estimators_[:n_trees]
+    smaller.n_estimators = n_trees
+    return smaller
+
+
+def distill_forest(clf, X_train, n_trees, max_depth):
+    student = RandomForestClassifier(n_estimators=n_trees, max_depth=max_depth, random_state=42, n_jobs=-1)
+    return student.fit(X_train, clf.predict(X_train))
+
+
+def candidates(clf, X_train):
+    n_trees = len(clf.estimators_)
+    for n in TREE_COUNTS:
+        if n < n_trees:
+            yield f"truncate(n_estimators={n})", lambda n=n: truncate_forest(clf, n)
+    for depth in MAX_DEPTHS:
+        for n in TREE_COUNTS:
+            if n <= n_trees:
+                yield f"distill(n_estimators={n}, max_depth={depth})", lambda n=n, depth=depth: distill_forest(clf, X_train, n, depth)
+
+
+def compress_forest(clf, X_train, X_val, y_val, X_test, y_test,
+                    tolerance=DEFAULT_RECALL_TOLERANCE, fpr_tolerance=DEFAULT_FPR_TOLERANCE):
+    """Smallest truncated or distilled forest that stays within tolerance of the original.
+
+    Candidates are accepted on the validation split only if recall drops by at most
+    tolerance and the false-positive rate rises by at most fpr_tolerance; the report's
+    metrics and latencies come from the separate test split. Falls back to the original
+    forest when no candidate passes.
+    """
+    baseline_recall, baseline_fpr = guard_metrics(y_val, clf.predict(X_val))
+    best, best_size, best_method = clf, artifact_size(clf), "original"
+    before_size = best_size
+
+    for method, build in candidates(clf, X_train):
+        model = build()
+        size = artifact_size(model)
+        if size >= best_size:
+            continue
+        recall, fpr = guard_metrics(y_val, model.predict(X_val))
+        if recall >= baseline_recall - tolerance and fpr <= baseline_fpr + fpr_tolerance:
+            best, best_size, best_method = model, size, method
+
+    recall_before, fpr_before = guard_metrics(y_test, clf.predict(X_test))
+    recall_after, fpr_after = guard_metrics(y_test, best.predict(X_test))
+    report = {
+        "method": best_method,
+        "recall_before": recall_before,
+        "recall_after": recall_after,
+        "false_positive_rate_before": fpr_before,
+        "false_positive_rate_after": fpr_after,
+        "size_before": before_size,
+        "size_after": best_size,
+        "latency_per_row_before": per_row_latency(clf, X_test),
+        "latency_per_row_after": per_row_latency(best, X_test),
+    }
+    return best, report
+
+
+def compress_models(models, X_train, X_val, y_val, X_test, y_test,
+                    tolerance=DEFAULT_RECALL_TOLERANCE, fpr_tolerance=DEFAULT_FPR_TOLERANCE):
+    """Compress either artifact layout; returns (models in the same layout, {name: report})."""
+    if isinstance(models, MultiLabelModels):
+        estimator, report = compress_forest(
+            models.estimator, X_train, X_val, y_val[models.allergens], X_test, y_test[models.allergens],
+            tolerance, fpr_tolerance
+        )
+        return MultiLabelModels(estimator, models.allergens, models.version), {"multi_label": report}
+
+    compressed, reports = {}, {}
+    for allergen, clf in models.items():
+        compressed[allergen], reports[allergen] = compress_forest(
+            clf, X_train, X_val, y_val[allergen], X_test, y_test[allergen], tolerance, fpr_tolerance
+        )
+    return compressed, reports
@@ -0,0 +1,78 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import numpy as np
+import pandas as pd
+
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", "data/feature_cache")
+# Bump when the featurization itself changes so old cache entries stop matching
+BUILDER_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def mapping_digest(allergen_mapping):
+    canonical = json.dumps({food: sorted(allergens) for food, allergens in allergen_mapping.items()}, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def cache_key(source_paths, allergen_mapping, allergens, namespace=""):
+    """Content address of a featurized dataset: source bytes + mapping content + column order + builder version."""
+    h = hashlib.sha256()
+    h.update(f"{namespace}:{BUILDER_VERSION}".encode("utf-8"))
+    for path in source_paths:
+        h.update(file_digest(path).encode("utf-8"))
+    h.update(mapping_digest(allergen_mapping).encode("utf-8"))
+    h.update("\x1f".join(allergens).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _save(path, frames):
+    arrays = {}
+    for name, frame in frames.items():
+        arrays[f"{name}__values"] = frame.to_numpy()
+        arrays[f"{name}__columns"] = np.asarray(frame.columns, dtype=str)
+
+    # Write then rename, so parallel experiments never read a partial file
+    fd, tmp_path = tempfile.mkstemp(suffix=".npz", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def _load(path):
+    frames = {}
+    with np.load(path, allow_pickle=False) as data:
+        for key in data.files:
+            if key.endswith("__values"):
+                name = key[:-len("__values")]
+                frames[name] = pd.DataFrame(data[key], columns=list(data[f"{name}__columns"]))
+    return frames
+
+
+def load_or_build(key, build, cache_dir=FEATURE_CACHE_DIR):
+    """Return the cached {name: DataFrame} for key, calling build() and storing its result on a miss."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{key}.npz")
+    if os.path.exists(path):
+        logger.info(f"Feature cache hit {key[:12]}")
+        return _load(path)
+
+    frames = build()
+    _save(path, frames)
+    logger.info(f"Feature cache stored {key[:12]}")
+    return frames
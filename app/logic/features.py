@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+
+def split_ingredients(ingredients):
+    if ingredients is None or (isinstance(ingredients, float) and np.isnan(ingredients)):
+        return []
+    if isinstance(ingredients, str):
+        ingredients = ingredients.split(',')
+    return [i.strip().lower() for i in ingredients]
+
+
+def explode_ingredients(ingredient_lists, allergen_mapping):
+    """Flatten meals x ingredients once into (meal row, food code) pairs for foods the mapping knows."""
+    foods = list(allergen_mapping)
+    food_codes = {food: i for i, food in enumerate(foods)}
+
+    exploded = pd.Series([split_ingredients(i) for i in ingredient_lists], dtype=object).explode()
+    codes = exploded.map(food_codes).dropna()
+    return codes.index.to_numpy(dtype=np.int64), codes.to_numpy(dtype=np.int64), foods
+
+
+def allergen_matrix(ingredient_lists, allergen_mapping, allergens):
+    """Binary meals x allergens matrix: 1 where any ingredient maps to the allergen."""
+    ingredient_lists = list(ingredient_lists)
+    columns = {allergen: i for i, allergen in enumerate(allergens)}
+    meal_rows, food_codes, foods = explode_ingredients(ingredient_lists, allergen_mapping)
+
+    # One-hot food -> allergen incidence; mapping lists are only read, never extended
+    incidence = np.zeros((len(foods), len(columns)), dtype=np.int64)
+    for i, food in enumerate(foods):
+        for allergen in allergen_mapping[food]:
+            col = columns.get(allergen)
+            if col is not None:
+                incidence[i, col] = 1
+
+    counts = np.zeros((len(ingredient_lists), len(columns)), dtype=np.int64)
+    np.add.at(counts, meal_rows, incidence[food_codes])
+    return (counts > 0).astype(np.int64)
+
+
+def build_features_and_labels(ingredient_lists, allergen_mapping, allergens):
+    """X and y for every allergen in one pass.
+
+    A meal's label for an allergen is "some ingredient maps to it", which is the same
+    incidence the features encode; y is returned as booleans, X as 0/1 ints.
+    """
+    allergens = list(allergens)
+    matrix = allergen_matrix(ingredient_lists, allergen_mapping, allergens)
+    X = pd.DataFrame(matrix, columns=allergens)
+    y = pd.DataFrame(matrix.astype(bool), columns=allergens)
+    return X, y
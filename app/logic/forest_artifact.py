@@ -0,0 +1,212 @@
+import os
+import json
+import shutil
+import tempfile
+from collections.abc import Mapping
+from datetime import datetime, timezone
+import numpy as np
+
+from app.logic.multilabel import MULTI_LABEL_LAYOUT, MultiLabelModels
+
+FORMAT_NAME = "forest-npy"
+FORMAT_VERSION = 2
+# v1 stored value as (n_nodes, 2); v2 adds an outputs axis for multi-label forests
+SUPPORTED_FORMAT_VERSIONS = (1, 2)
+MANIFEST_FILE = "manifest.json"
+ARRAYS = ("left", "right", "feature", "threshold", "value", "roots")
+PREDICT_CHUNK_ROWS = 4096
+
+
+def _output_classes(clf):
+    # Multi-output forests keep a list of class arrays, one per output
+    classes = clf.classes_ if isinstance(clf.classes_, list) else [clf.classes_]
+    return [[int(c) for c in output] for output in classes]
+
+
+def _tree_arrays(tree, classes, offset):
+    t = tree.tree_
+    is_leaf = t.children_left == -1
+    left = np.where(is_leaf, -1, t.children_left + offset)
+    right = np.where(is_leaf, -1, t.children_right + offset)
+
+    # Normalised class distribution per node and output for classes (0, 1), as predict_proba sees it
+    value = np.zeros((t.node_count, len(classes), 2), dtype=np.float64)
+    for output, output_classes in enumerate(classes):
+        counts = t.value[:, output, :len(output_classes)]
+        proba = counts / np.maximum(counts.sum(axis=1, keepdims=True), np.finfo(np.float64).tiny)
+        for col, cls in enumerate(output_classes):
+            value[:, output, cls] = proba[:, col]
+
+    return left, right, t.feature.astype(np.int32), t.threshold.astype(np.float64), value
+
+
+def export_models(models, out_dir, version=None):
+    """Write forests as flat .npy tree arrays plus a JSON manifest.
+
+    Accepts the per-allergen {allergen: forest} dict or a MultiLabelModels. The directory
+    is built next to its destination and moved into place, so readers never see a
+    half-written artifact.
+    """
+    features = list(models)
+    parts = {name: [] for name in ARRAYS}
+    allergens = {}
+    offset = 0
+
+    if isinstance(models, MultiLabelModels):
+        layout = MULTI_LABEL_LAYOUT
+        forests = {MULTI_LABEL_LAYOUT: models.estimator}
+    else:
+        layout = "per_allergen"
+        forests = models
+
+    for name, clf in forests.items():
+        classes = _output_classes(clf)
+        first_tree = sum(len(r) for r in parts["roots"])
+        roots = []
+        for tree in clf.estimators_:
+            left, right, feature, threshold, value = _tree_arrays(tree, classes, offset)
+            parts["left"].append(left)
+            parts["right"].append(right)
+            parts["feature"].append(feature)
+            parts["threshold"].append(threshold)
+            parts["value"].append(value)
+            roots.append(offset)
+            offset += len(left)
+        parts["roots"].append(np.asarray(roots, dtype=np.int64))
+        allergens[name] = {
+            "trees": [first_tree, first_tree + len(roots)],
+            "classes": classes if layout == MULTI_LABEL_LAYOUT else classes[0],
+            "threshold": 0.5
+        }
+
+    out_dir = out_dir.rstrip("/")
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+    try:
+        np.save(os.path.join(tmp_dir, "left.npy"), np.concatenate(parts["left"]).astype(np.int32))
+        np.save(os.path.join(tmp_dir, "right.npy"), np.concatenate(parts["right"]).astype(np.int32))
+        np.save(os.path.join(tmp_dir, "feature.npy"), np.concatenate(parts["feature"]))
+        np.save(os.path.join(tmp_dir, "threshold.npy"), np.concatenate(parts["threshold"]))
+        np.save(os.path.join(tmp_dir, "value.npy"), np.concatenate(parts["value"]))
+        np.save(os.path.join(tmp_dir, "roots.npy"), np.concatenate(parts["roots"]))
+
+        manifest = {
+            "format": FORMAT_NAME,
+            "format_version": FORMAT_VERSION,
+            "version": version or os.path.basename(out_dir),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "layout": layout,
+            "features": features,
+            "allergens": allergens
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        if os.path.exists(out_dir):
+            shutil.rmtree(out_dir)
+        os.replace(tmp_dir, out_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return out_dir
+
+
+class MappedForest:
+    """A forest evaluated straight from read-only memory-mapped tree arrays.
+
+    predict returns one column per output for multi-label forests, a flat vector otherwise.
+    """
+
+    def __init__(self, arrays, roots, features, classes, threshold=0.5):
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.features = features
+        self.multi_output = bool(classes) and isinstance(classes[0], list)
+        self.output_classes = classes if self.multi_output else [classes]
+        self.decision_threshold = threshold
+
+    def _leaves(self, X):
+        rows = np.arange(len(X))[None, :]
+        node = np.repeat(self.roots[:, None], len(X), axis=1)
+        while True:
+            left = self.left[node]
+            active = left != -1
+            if not active.any():
+                return node
+            feature = np.where(active, self.feature[node], 0)
+            go_left = X[rows, feature] <= self.threshold[node]
+            node = np.where(active, np.where(go_left, left, self.right[node]), node)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        n_outputs = len(self.output_classes)
+        proba = np.zeros((len(X), n_outputs, 2), dtype=np.float64)
+        for start in range(0, len(X), PREDICT_CHUNK_ROWS):
+            chunk = X[start:start + PREDICT_CHUNK_ROWS]
+            proba[start:start + len(chunk)] = self.value[self._leaves(chunk)][..., :n_outputs, :].sum(axis=0)
+        return proba / max(len(self.roots), 1)
+
+    def predict(self, X):
+        proba = self.predict_proba(X)
+        predicted = (proba[:, :, 1] > self.decision_threshold).astype(np.int64)
+        for output, classes in enumerate(self.output_classes):
+            if len(classes) == 1:
+                predicted[:, output] = classes[0]
+        return predicted if self.multi_output else predicted[:, 0]
+
+
+class MappedModels(Mapping):
+    """Read-only allergen -> MappedForest mapping backed by one per-allergen artifact directory."""
+
+    def __init__(self, path, manifest, arrays):
+        self.path = path
+        self.manifest = manifest
+        self.version = manifest["version"]
+        self.features = manifest["features"]
+        self._forests = {
+            allergen: MappedForest(
+                arrays,
+                arrays["roots"][spec["trees"][0]:spec["trees"][1]],
+                self.features,
+                spec["classes"],
+                spec.get("threshold", 0.5)
+            )
+            for allergen, spec in manifest["allergens"].items()
+        }
+
+    def __getitem__(self, allergen):
+        return self._forests[allergen]
+
+    def __iter__(self):
+        return iter(self._forests)
+
+    def __len__(self):
+        return len(self._forests)
+
+
+def is_artifact(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+def load_artifact(path):
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_NAME or manifest.get("format_version") not in SUPPORTED_FORMAT_VERSIONS:
+        raise ValueError(f"Unsupported model artifact format in {path}")
+
+    # Zero-copy: every worker maps the same page-cache pages
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+    if arrays["value"].ndim == 2:
+        arrays["value"] = arrays["value"][:, None, :]
+
+    if manifest.get("layout") == MULTI_LABEL_LAYOUT:
+        spec = manifest["allergens"][MULTI_LABEL_LAYOUT]
+        forest = MappedForest(arrays, arrays["roots"][spec["trees"][0]:spec["trees"][1]], manifest["features"],
+                              spec["classes"], spec.get("threshold", 0.5))
+        return MultiLabelModels(forest, manifest["features"], manifest["version"])
+    return MappedModels(path, manifest, arrays)
@@ -0,0 +1,51 @@
+from collections.abc import Mapping
+import numpy as np
+
+MULTI_LABEL_LAYOUT = "multi_label"
+
+
+class LabelView:
+    """Per-allergen view of a multi-label model, for callers that expect models[allergen].predict."""
+
+    def __init__(self, parent, index):
+        self.parent = parent
+        self.index = index
+
+    def predict(self, X):
+        return self.parent.predict_labels(X)[:, self.index].astype(np.int64)
+
+
+class MultiLabelModels(Mapping):
+    """One multi-output estimator serving every allergen label in a single predict call.
+
+    Behaves like the per-allergen {allergen: model} dict, so either artifact layout can be
+    passed wherever models are expected.
+    """
+
+    def __init__(self, estimator, allergens, version=None):
+        self.estimator = estimator
+        self.allergens = list(allergens)
+        self.version = version
+        self._views = {allergen: LabelView(self, i) for i, allergen in enumerate(self.allergens)}
+
+    def predict_labels(self, X):
+        predicted = np.asarray(self.estimator.predict(X))
+        if predicted.ndim == 1:
+            predicted = predicted[:, None]
+        return predicted == 1
+
+    def __getitem__(self, allergen):
+        return self._views[allergen]
+
+    def __iter__(self):
+        return iter(self.allergens)
+
+    def __len__(self):
+        return len(self.allergens)
+
+
+def wrap_models(obj):
+    """Accept either the per-allergen dict or a pickled {"layout": "multi_label", ...} payload."""
+    if isinstance(obj, dict) and obj.get("layout") == MULTI_LABEL_LAYOUT:
+        return MultiLabelModels(obj["model"], obj["allergens"])
+    return obj
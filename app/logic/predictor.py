@@ -1,31 +1,55 @@
+import numpy as np
 import pandas as pd
 
-def predict_safe_meals(models, allergen_mapping, meals, user_input):
-    safe_meals = []
-
-    for meal in meals:
-        ingredients = meal.ingredients if isinstance(meal.ingredients, list) else meal.ingredients.split(',')
-        ingredients = [i.strip().lower() for i in ingredients]
-
-        # Create allergen feature vector
-        feature_vector = {allergen: 0 for allergen in models}
-        for ingredient in ingredients:
-            found_allergens = allergen_mapping.get(ingredient, [])
-            for allergen in found_allergens:
-                if allergen in feature_vector:
-                    feature_vector[allergen] = 1
-
-        # Check predictions
-        is_safe = True
-        for allergen in user_input["allergies"]:
-            if allergen in models:
-                clf = models[allergen]
-                prediction = clf.predict(pd.DataFrame([feature_vector]))[0]
-                if prediction == 1:
-                    is_safe = False
-                    break
-
-        if is_safe:
-            safe_meals.append(meal)
-
-    return safe_meals
\ No newline at end of file
+from app.logic.features import allergen_matrix
+
+def feature_matrix_from_allergens(models, meal_allergens):
+    features = list(models)
+    columns = {allergen: i for i, allergen in enumerate(features)}
+    matrix = np.zeros((len(meal_allergens), len(features)), dtype=np.int64)
+
+    for row, allergens in enumerate(meal_allergens):
+        for allergen in allergens:
+            col = columns.get(allergen)
+            if col is not None:
+                matrix[row, col] = 1
+
+    return pd.DataFrame(matrix, columns=features)
+
+
+def build_feature_matrix(models, allergen_mapping, meals):
+    features = list(models)
+    matrix = allergen_matrix([meal.ingredients for meal in meals], allergen_mapping, features)
+    return pd.DataFrame(matrix, columns=features)
+
+
+def predict_labels(models, X, compiled=None):
+    if compiled is not None:
+        return compiled.predict_labels(X)
+    if hasattr(models, "predict_labels"):
+        # Multi-label artifact: every allergen in one pass
+        return models.predict_labels(X)
+    labels = np.zeros((len(X), len(models)), dtype=bool)
+    for i, allergen in enumerate(models):
+        labels[:, i] = np.asarray(models[allergen].predict(X)) == 1
+    return labels
+
+
+def predict_safe_meals(models, allergen_mapping, meals, user_input, X=None):
+    meals = list(meals)
+    allergies = [allergen for allergen in dict.fromkeys(user_input["allergies"]) if allergen in models]
+    if not meals or not allergies:
+        return meals
+
+    # One feature matrix for the whole catalog (precomputed rows when given), one predict call per allergen
+    if X is None:
+        X = build_feature_matrix(models, allergen_mapping, meals)
+    if hasattr(models, "predict_labels"):
+        positions = [list(models).index(allergen) for allergen in allergies]
+        unsafe = models.predict_labels(X)[:, positions].any(axis=1)
+    else:
+        unsafe = np.zeros(len(meals), dtype=bool)
+        for allergen in allergies:
+            unsafe |= models[allergen].predict(X) == 1
+
+    return [meal for meal, is_unsafe in zip(meals, unsafe) if not is_unsafe]
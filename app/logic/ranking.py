@@ -0,0 +1,70 @@
+import numpy as np
+
+SORT_KEYS = ("fit", "calories", "protein", "carbs", "fats")
+DEFAULT_MEALS_PER_DAY = 3
+
+
+def meal_targets(daily_calories, protein, carbs, fats, meals_per_day=DEFAULT_MEALS_PER_DAY):
+    """Per-meal (calories, protein g, carbs g, fats g) targets from the daily ones."""
+    return np.array([daily_calories, protein, carbs, fats], dtype=np.float64) / max(meals_per_day, 1)
+
+
+def fit_distance(values, targets):
+    """Distance of each meal's (calories, protein, carbs, fats) row from the per-meal targets.
+
+    Each component is a relative error, so grams and kcal weigh the same; targets that are
+    not positive are ignored and meals missing a used component sort last.
+    """
+    used = targets > 0
+    if not used.any():
+        return np.zeros(len(values))
+    relative = (values[:, used] - targets[used]) / targets[used]
+    distance = np.sqrt(np.square(relative).sum(axis=1))
+    return np.where(np.isnan(distance), np.inf, distance)
+
+
+def top_k(scores, k):
+    """Positions of the k smallest scores in ascending order (ties keep input order), without a full sort."""
+    n = len(scores)
+    if k is None or k >= n:
+        return np.lexsort((np.arange(n), scores))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    candidates = np.argpartition(scores, k - 1)[:k]
+    # argpartition picks an arbitrary subset among scores tied at the k-th value; re-pick them by position
+    kth = scores[candidates].max()
+    below = np.flatnonzero(scores < kth)
+    tied = np.flatnonzero(scores == kth)[:k - len(below)]
+    chosen = np.concatenate([below, tied])
+    return chosen[np.lexsort((chosen, scores[chosen]))]
+
+
+def sort_scores(catalog, rows, sort_by=None, descending=False, targets=None):
+    """Ascending sort key for each row; sort_by=None orders by meal id (catalog order)."""
+    if sort_by is None:
+        return catalog.ids[rows].astype(np.float64)
+    if sort_by == "fit":
+        values = np.column_stack([catalog.calories[rows], catalog.protein[rows], catalog.carbs[rows], catalog.fats[rows]])
+        return fit_distance(values, targets)
+    if sort_by in SORT_KEYS:
+        scores = getattr(catalog, sort_by)[rows]
+        return np.where(np.isnan(scores), np.inf, -scores if descending else scores)
+    raise ValueError(f"Unknown sort key: {sort_by}")
+
+
+def rank_rows(catalog, rows, sort_by=None, descending=False, targets=None, limit=None, after=None):
+    """One page of catalog rows ordered by (sort key, meal id); returns (rows, scores).
+
+    after is the (score, meal id) of the previous page's last row, so pages never overlap
+    or skip rows however the candidate set is sized.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    scores = sort_scores(catalog, rows, sort_by, descending, targets)
+    if after is not None:
+        score, meal_id = after
+        ids = catalog.ids[rows]
+        keep = (scores > score) | ((scores == score) & (ids > meal_id))
+        rows, scores = rows[keep], scores[keep]
+    # rows arrive in id order, so top_k's positional tie-break is the id tie-break
+    order = top_k(scores, limit)
+    return rows[order], scores[order]
@@ -0,0 +1,129 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+from app.logic.multilabel import LabelView
+from app.logic.predictor import predict_labels
+
+# Feature spaces up to this width are enumerated completely at model load (2 ** 12 rows);
+# wider ones are compiled from the catalog's feature matrix when the safety index is built
+MAX_ENUMERATED_FEATURES = 12
+# Catalog rows checked against the raw forests after each compile (full enumerations are checked whole)
+VERIFY_SAMPLE_SIZE = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def all_patterns(n_features):
+    codes = np.arange(2 ** n_features, dtype=np.int64)
+    return ((codes[:, None] >> np.arange(n_features)) & 1).astype(np.int64)
+
+
+def _positive_proba(estimator, X, output=0):
+    """P(label == 1) for one output and its decision threshold, read from the estimator's class probabilities."""
+    if hasattr(estimator, "output_classes"):
+        # Memory-mapped forest: (rows, outputs, 2) with a stored threshold
+        proba = estimator.predict_proba(X)[:, output, :]
+        classes, threshold = estimator.output_classes[output], estimator.decision_threshold
+    else:
+        proba, classes, threshold = estimator.predict_proba(X), estimator.classes_, 0.5
+        if isinstance(proba, list):
+            # sklearn multi-output: one (rows, classes) array per label
+            proba, classes = proba[output], classes[output]
+
+    classes = list(classes)
+    if len(classes) == 1:
+        return np.full(len(X), float(classes[0] == 1)), threshold
+    return np.asarray(proba)[:, classes.index(1) if 1 in classes else 1], threshold
+
+
+def reference_labels(models, patterns, features):
+    """Labels straight from each allergen's predict_proba, independent of predict_labels and the table."""
+    X = pd.DataFrame(patterns, columns=features)
+    labels = np.zeros((len(X), len(models)), dtype=bool)
+    for i, allergen in enumerate(models):
+        model = models[allergen]
+        if isinstance(model, LabelView):
+            positive, threshold = _positive_proba(model.parent.estimator, X, model.index)
+        else:
+            positive, threshold = _positive_proba(model, X)
+        labels[:, i] = positive > threshold
+    return labels
+
+
+class CompiledModels:
+    """Per-allergen models compiled into a lookup table from binary feature pattern to predicted labels.
+
+    Rows whose pattern is already in the table need no model call; unseen patterns are
+    evaluated once against the forests and added.
+    """
+
+    def __init__(self, models):
+        self.models = models
+        self.features = list(models)
+        self.allergens = list(models)
+        self.table = {}
+        self._lock = threading.Lock()
+
+    def copy(self):
+        """Independent table over the same models, for callers that add their own patterns."""
+        compiled = CompiledModels(self.models)
+        with self._lock:
+            compiled.table = dict(self.table)
+        return compiled
+
+    def _evaluate(self, patterns):
+        return predict_labels(self.models, pd.DataFrame(patterns, columns=self.features))
+
+    @staticmethod
+    def _unique_patterns(X):
+        packed = np.packbits(np.asarray(X, dtype=np.uint8), axis=1)
+        unique, first, inverse = np.unique(packed, axis=0, return_index=True, return_inverse=True)
+        keys = [row.tobytes() for row in unique]
+        return keys, first, inverse.reshape(-1)
+
+    def compile(self, X=None):
+        patterns = all_patterns(len(self.features)) if X is None else np.asarray(X, dtype=np.int64)
+        self.predict_labels(patterns)
+        return self
+
+    def predict_labels(self, X):
+        X = np.asarray(X, dtype=np.int64)
+        if not len(X):
+            return np.zeros((0, len(self.allergens)), dtype=bool)
+
+        keys, first, inverse = self._unique_patterns(X)
+        missing = [i for i, key in enumerate(keys) if key not in self.table]
+        if missing:
+            labels = self._evaluate(X[first[missing]])
+            with self._lock:
+                for i, row in zip(missing, labels):
+                    self.table[keys[i]] = row
+
+        unique_labels = np.stack([self.table[key] for key in keys])
+        return unique_labels[inverse]
+
+    def verify(self, X, sample_size=VERIFY_SAMPLE_SIZE, seed=0):
+        """Check table lookups for (a sample of) rows X against the forests' class probabilities; raises ValueError on any disagreement."""
+        X = np.asarray(X, dtype=np.int64)
+        if len(X) > sample_size:
+            X = X[np.random.RandomState(seed).choice(len(X), sample_size, replace=False)]
+        expected = reference_labels(self.models, X, self.features)
+        actual = self.predict_labels(X)
+        mismatches = int((expected != actual).any(axis=1).sum())
+        if mismatches:
+            raise ValueError(f"Compiled model disagrees with the forests on {mismatches} of {len(X)} rows")
+        return True
+
+
+def compile_models(models, X=None):
+    """Compile at model load; with the catalog feature matrix X, also precompile and verify its patterns."""
+    compiled = CompiledModels(models)
+    if len(compiled.features) <= MAX_ENUMERATED_FEATURES:
+        patterns = all_patterns(len(compiled.features))
+        compiled.compile(patterns).verify(patterns, sample_size=len(patterns))
+    if X is not None:
+        compiled.compile(X).verify(X)
+    logger.info(f"Compiled {len(compiled.allergens)} allergen models into {len(compiled.table)} patterns")
+    return compiled
@@ -9,7 +9,12 @@ from starlette.middleware.sessions import SessionMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.scheduler import scheduler, stop_scheduler
+from app.core.db import SessionLocal
+from app.services.model_loader import model_registry
+from app.services.regeneration import regeneration_queue
+from app.services.search import get_ingredient_index, get_search_index
 from app.middleware.auth_middleware import JWTAuthenticationMiddleware
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 
 from app.api.routes.auth import router as auth_router
@@ -24,8 +29,22 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    try:
+        model_registry.load()
+    except Exception as e:
+        logger.error(f"Failed to load model at startup: {e}")
+    db = SessionLocal()
+    try:
+        get_search_index(db)
+        get_ingredient_index(db)
+    except Exception as e:
+        logger.error(f"Failed to build catalog indexes at startup: {e}")
+    finally:
+        db.close()
+    regeneration_queue.start()
     logger.info("FastAPI app started, scheduler is running.")
     yield
+    regeneration_queue.shutdown()
     stop_scheduler()
 
 app = FastAPI(lifespan=lifespan)
@@ -46,7 +65,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Authorization"]
+    expose_headers=["Authorization", NEXT_CURSOR_HEADER]
 )
 
 
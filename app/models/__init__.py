@@ -1,8 +1,9 @@
 from app.models.meal import Meal
 from app.models.user import User
 from app.models.allergy import Allergy
-from app.models.user_meals import UserMeal
+from app.models.user_meal_set import UserMealSet
 from app.models.user_favorite_meals import UserFavoriteMeal
 from app.models.allergen_mapping import AllergenMapping
 from app.models.blacklisted_token import BlacklistedToken
 from app.models.user_daily_consumption import UserDailyConsumption
+from app.models.meal_allergen_features import MealAllergenFeatures
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import validates
-from sqlalchemy import Column, Integer, Float, String, Text
+from sqlalchemy import Column, DateTime, Integer, Float, String, Text, func
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from app.core.db import Base
@@ -23,14 +23,13 @@ class Meal(Base):
     country_origin = Column(String(100))  
     ingredients = Column(ARRAY(String), nullable=False, default=[])
     meal_type = Column(String(50))
-        
+    # Set by the meals_touch_updated_at trigger on every UPDATE
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
 
-    shown_to_users = relationship("UserMeal", back_populates="meal", cascade="all, delete-orphan")
     favorited_by = relationship("UserFavoriteMeal", back_populates="meal", cascade="all, delete-orphan")
+    allergen_features = relationship("MealAllergenFeatures", back_populates="meal", uselist=False, cascade="all, delete-orphan")
 
     @validates("meal_time")
     def normalize_meal_time(self, key, value):
         return value.strip().lower() if value else None
     
-
-    
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from app.core.db import Base
+
+class MealAllergenFeatures(Base):
+    __tablename__ = "meal_allergen_features"
+
+    meal_id = Column(Integer, ForeignKey("meals.id", ondelete="CASCADE"), primary_key=True)
+    # Sparse feature row: the allergens the meal's ingredients map to
+    allergens = Column(ARRAY(String), nullable=False, default=[])
+    ingredients_hash = Column(String(40), nullable=False)
+    mapping_version = Column(String(50), nullable=False)
+    # meals.updated_at the row was built from; any later edit to the meal makes it stale
+    meal_updated_at = Column(DateTime)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    meal = relationship("Meal", back_populates="allergen_features")
@@ -31,7 +31,7 @@ class User(Base):
     info_gathered_init = Column(Boolean,default=False);
     meals_initialized = Column(Boolean, default=False)
 
-    meals_shown = relationship("UserMeal", back_populates="user", cascade="all, delete-orphan")
+    meal_set = relationship("UserMealSet", back_populates="user", uselist=False, cascade="all, delete-orphan")
     
     favorite_meals = relationship("UserFavoriteMeal", back_populates="user", cascade="all, delete-orphan")
 
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import relationship
+from datetime import date, datetime, timezone
+from app.core.db import Base
+
+class UserMealSet(Base):
+    __tablename__ = "user_meal_sets"
+
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    # The user's safe & diet-compatible meals, in recommendation order; details are joined from meals
+    meal_ids = Column(ARRAY(Integer), nullable=False, default=[])
+    date_shown = Column(Date, default=date.today)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    user = relationship("User", back_populates="meal_set")
@@ -1,4 +1,5 @@
 from typing import List, Optional
+from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel
 
@@ -27,6 +28,7 @@ class PredictionResponse(BaseModel):
     daily_calories: float
     macros: Macros
     recommended_meals: List[MealItem]
+    next_cursor: Optional[str] = None
 
 class MealDetailResponse(BaseModel):
     id: int
@@ -45,7 +47,7 @@ class MealDetailResponse(BaseModel):
     meal_type: Optional[str]        
 
 class MealSearchResult(BaseModel):
-    id: UUID
+    id: int
     name: str
     instruction: str
     calories: Optional[float]
@@ -57,4 +59,8 @@ class MealSearchResult(BaseModel):
     meal_cooking_time: Optional[str]     
     meal_cooking_method: Optional[List[str]] = None   
     origin: Optional[str]
-    meal_type: Optional[str]        
+    meal_type: Optional[str]
+
+class ModelInfoResponse(BaseModel):
+    version: str
+    loaded_at: datetime
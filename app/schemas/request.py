@@ -1,14 +1,21 @@
-from pydantic import BaseModel, validator
-from typing import List, Optional
+from pydantic import BaseModel, Field, validator
+from typing import List, Literal, Optional
 
 class PredictRequest(BaseModel):
     user_id: int
+    cursor: Optional[str] = None
     meal_type: Optional[str] = None
     meal_cooking_method: Optional[List[str]] = None
-    limit: Optional[int] = None
+    limit: Optional[int] = Field(None, ge=1)
     excluded_ingredients: Optional[List[str]] = []
     meal_cooking_time: Optional[str] = None
     diet_type: Optional[str] = None
+    min_calories: Optional[float] = None
+    max_calories: Optional[float] = None
+    # "fit" ranks by closeness to the user's per-meal calorie/macro targets; descending applies to the nutrient keys
+    sort_by: Optional[Literal["fit", "calories", "protein", "carbs", "fats"]] = None
+    descending: bool = False
+    meals_per_day: int = Field(3, ge=1, le=10)
 
     @validator("meal_type", "diet_type", pre=True)
     def normalize_str(cls, v):
@@ -2,7 +2,7 @@ from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional, List
 from typing_extensions import Annotated 
-from datetime import date
+from datetime import date, datetime
 
 # ------------------------ User Signup ------------------------
 class UserCreate(BaseModel):
@@ -45,11 +45,22 @@ class UserResponse(BaseModel):
     carbs: Optional[float] = None    
     fats: Optional[float] = None
     info_gathered_init: Optional[bool] = False 
-    
+    meals_initialized: Optional[bool] = None
+    regeneration_job_id: Optional[str] = None
 
     class Config:
         from_attributes = True 
 
+# ------------------------ Meal Regeneration ------------------------
+class RegenerationStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    progress: float
+    meals_generated: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
 # ------------------------ User Health Form ------------------------
 class UserProfile(BaseModel):
     name: Optional[str] = None 
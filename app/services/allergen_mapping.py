@@ -0,0 +1,107 @@
+import os
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.models.allergen_mapping import AllergenMapping
+
+MAPPING_REFRESH_INTERVAL = float(os.getenv("ALLERGEN_MAPPING_REFRESH_INTERVAL", 30))
+
+logger = logging.getLogger(__name__)
+
+# Synonym Mapping (Extend this list for more ingredient synonyms)
+SYNONYM_MAPPING = {
+    "groundnuts": "peanuts",
+    "peanut butter": "peanuts",
+    "dairy": "milk",
+    "seafood": "fish",
+    "prawns": "shrimp",
+}
+
+# Cross-reactivity mapping for specific allergens (e.g., latex-fruit syndrome)
+CROSS_REACTIVITY_MAPPING = {
+    "bananas": ["latex allergy"],
+    "avocados": ["latex allergy"],
+    "shellfish": ["fish allergy"],
+}
+
+
+def allergens_for(base_mapping: Dict[str, List[str]], ingredient: str) -> List[str]:
+    ingredient = SYNONYM_MAPPING.get(ingredient, ingredient)
+    return base_mapping.get(ingredient, []) + CROSS_REACTIVITY_MAPPING.get(ingredient, [])
+
+
+def enhance_mapping(base_mapping: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    foods = set(base_mapping) | set(SYNONYM_MAPPING) | set(CROSS_REACTIVITY_MAPPING)
+    return {food: allergens_for(base_mapping, food) for food in foods}
+
+
+class AllergenMappingService:
+    """Food -> allergens mapping loaded from the allergen_mapping table.
+
+    The enhanced mapping already folds in synonyms and cross-reactivity, so a plain
+    mapping.get(ingredient) matches what training sees. It is rebuilt only when the
+    hash of the table's (food, allergen) rows changes.
+    """
+
+    def __init__(self, refresh_interval: float = MAPPING_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.version: Optional[str] = None
+        self.base_mapping: Dict[str, List[str]] = {}
+        self.mapping: Dict[str, List[str]] = {}
+        self.allergens: List[str] = []
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+
+    @staticmethod
+    def _rows(db: Session):
+        return db.query(AllergenMapping.food, AllergenMapping.allergen).order_by(
+            AllergenMapping.food, AllergenMapping.allergen
+        ).all()
+
+    @staticmethod
+    def _version_stamp(rows) -> str:
+        # Content hash, so in-place edits and delete+insert swaps change the version too
+        digest = hashlib.sha1()
+        for food, allergen in rows:
+            digest.update(f"{food}\x1f{allergen}\x1e".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _load(self, rows, version: str):
+        base_mapping = {}
+        for food, allergen in rows:
+            base_mapping.setdefault(food.strip().lower(), []).append(allergen.strip().lower())
+
+        self.base_mapping = base_mapping
+        self.mapping = enhance_mapping(base_mapping)
+        self.allergens = sorted({a for allergens in base_mapping.values() for a in allergens})
+        self.version = version
+        logger.info(f"Loaded allergen mapping version {version} ({len(base_mapping)} foods)")
+
+    def refresh(self, db: Optional[Session] = None, force: bool = False):
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            with self._lock:
+                if not force and self.version is not None and time.monotonic() - self._last_check < self.refresh_interval:
+                    return
+                self._last_check = time.monotonic()
+                # The table is small; reading it whole is the version check
+                rows = self._rows(db)
+                version = self._version_stamp(rows)
+                if force or version != self.version:
+                    self._load(rows, version)
+        finally:
+            if own_session:
+                db.close()
+
+    def get_mapping(self, db: Optional[Session] = None) -> Dict[str, List[str]]:
+        self.refresh(db)
+        return self.mapping
+
+
+allergen_mapping_service = AllergenMappingService()
@@ -0,0 +1,161 @@
+import os
+import time
+import logging
+import threading
+from typing import List, NamedTuple, Optional
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.meal import Meal
+from app.models.meal_allergen_features import MealAllergenFeatures
+from app.utils.helpers import normalize_terms, parse_cooking_minutes
+
+# How often (seconds) a request may pay for the catalog version query
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", 5))
+
+logger = logging.getLogger(__name__)
+
+
+def catalog_version(db: Session) -> str:
+    """Cheap stamp that changes whenever a meal is added, removed or edited, or allergen features are rebuilt.
+
+    meals.updated_at is bumped by a trigger on every UPDATE, so in-place edits count too.
+    """
+    count, max_id, meals_updated = db.query(func.count(Meal.id), func.max(Meal.id), func.max(Meal.updated_at)).one()
+    features_updated = db.query(func.max(MealAllergenFeatures.updated_at)).scalar()
+    stamps = "-".join(t.isoformat() if t else "none" for t in (meals_updated, features_updated))
+    return f"{count}-{max_id or 0}-{stamps}"
+
+
+class MealRecord(NamedTuple):
+    # Same attribute names as Meal, so response builders work on either
+    id: int
+    name: str
+    instruction: str
+    total_calories: Optional[float]
+    fats: Optional[float]
+    carbs: Optional[float]
+    protein: Optional[float]
+    diet_type: Optional[List[str]]
+    meal_difficulty: Optional[str]
+    meal_cooking_time: Optional[str]
+    meal_cooking_method: Optional[List[str]]
+    country_origin: Optional[str]
+    ingredients: Optional[List[str]]
+    meal_type: Optional[str]
+
+
+def _float_column(values):
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def _inverted(term_lists):
+    rows = {}
+    for row, terms in enumerate(term_lists):
+        for term in set(terms):
+            rows.setdefault(term, []).append(row)
+    return {term: np.asarray(r, dtype=np.int64) for term, r in rows.items()}
+
+
+class MealCatalog:
+    """Read-only, process-wide copy of the meals table in columnar form.
+
+    Rows are ordered by meal id. Scalar attributes are NumPy arrays (NaN for missing),
+    meal_type is interned to integer codes, and multi-valued attributes (diet, cooking
+    method, ingredients) are inverted lists of row numbers, so every filter is a mask.
+    """
+
+    def __init__(self, meals, version=None):
+        meals = sorted(meals, key=lambda m: m.id)
+        self.version = version
+        self.meals = [MealRecord(*(getattr(m, field) for field in MealRecord._fields)) for m in meals]
+        self.ids = np.array([m.id for m in meals], dtype=np.int64)
+
+        self.calories = _float_column(m.total_calories for m in meals)
+        self.protein = _float_column(m.protein for m in meals)
+        self.carbs = _float_column(m.carbs for m in meals)
+        self.fats = _float_column(m.fats for m in meals)
+        self.cooking_minutes = _float_column(parse_cooking_minutes(m.meal_cooking_time) for m in meals)
+
+        meal_types = [(m.meal_type or "").strip().lower() or None for m in meals]
+        self.meal_types = {t: i for i, t in enumerate(sorted({t for t in meal_types if t}))}
+        self.meal_type_codes = np.array([self.meal_types.get(t, -1) for t in meal_types], dtype=np.int32)
+
+        self.diet_rows = _inverted(normalize_terms(m.diet_type) for m in meals)
+        self.method_rows = _inverted(normalize_terms(m.meal_cooking_method) for m in meals)
+        self.ingredient_rows = _inverted(normalize_terms(m.ingredients) for m in meals)
+
+    @classmethod
+    def from_db(cls, db: Session, version=None):
+        return cls(db.query(Meal).order_by(Meal.id).all(), version)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows(self, meal_ids):
+        """Row numbers of the given meal ids (ids not in the catalog are dropped), in catalog order."""
+        return np.flatnonzero(self.membership(meal_ids))
+
+    def membership(self, meal_ids):
+        return np.isin(self.ids, np.asarray(meal_ids, dtype=np.int64))
+
+    def record(self, meal_id):
+        row = np.searchsorted(self.ids, meal_id)
+        if row < len(self.ids) and self.ids[row] == meal_id:
+            return self.meals[row]
+        return None
+
+    def _any_of(self, index, terms):
+        mask = np.zeros(len(self.ids), dtype=bool)
+        for term in normalize_terms(terms):
+            rows = index.get(term)
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    def mask(self, meal_type=None, diet_type=None, cooking_methods=None, max_cooking_minutes=None,
+             excluded_ingredients=None, min_calories=None, max_calories=None):
+        """Boolean row mask for the given filters; unset filters match everything."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        if meal_type:
+            mask &= self.meal_type_codes == self.meal_types.get(meal_type.strip().lower(), -2)
+        if diet_type:
+            mask &= self._any_of(self.diet_rows, [diet_type])
+        if cooking_methods:
+            mask &= self._any_of(self.method_rows, cooking_methods)
+        if max_cooking_minutes is not None:
+            # NaN (unparseable time) never satisfies a bound
+            mask &= self.cooking_minutes <= max_cooking_minutes
+        if excluded_ingredients:
+            mask &= ~self._any_of(self.ingredient_rows, excluded_ingredients)
+        if min_calories is not None:
+            mask &= self.calories >= min_calories
+        if max_calories is not None:
+            mask &= self.calories <= max_calories
+        return mask
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+_last_check = 0.0
+
+
+def get_meal_catalog(db: Session) -> MealCatalog:
+    """Catalog for the current catalog version; the version is re-checked at most every CATALOG_REFRESH_INTERVAL."""
+    global _catalog, _last_check
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - _last_check < CATALOG_REFRESH_INTERVAL:
+        return catalog
+
+    version = catalog_version(db)
+    _last_check = time.monotonic()
+    if catalog is not None and catalog.version == version:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is not None and _catalog.version == version:
+            return _catalog
+        _catalog = MealCatalog.from_db(db, version)
+        logger.info(f"Loaded meal catalog with {len(_catalog)} meals (version {version})")
+        return _catalog
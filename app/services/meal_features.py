@@ -0,0 +1,97 @@
+import hashlib
+import logging
+from datetime import datetime, timezone
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.meal import Meal
+from app.models.meal_allergen_features import MealAllergenFeatures
+from app.services.allergen_mapping import allergen_mapping_service
+
+logger = logging.getLogger(__name__)
+
+
+def ingredients_hash(ingredients) -> str:
+    normalized = "\x1f".join(i.strip().lower() for i in (ingredients or []))
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def meal_allergens(allergen_mapping, ingredients):
+    allergens = {}
+    for ingredient in ingredients or []:
+        for allergen in allergen_mapping.get(ingredient.strip().lower(), []):
+            allergens[allergen] = True
+    return sorted(allergens)
+
+
+def sync_meal_features(db: Session, mapping_service=allergen_mapping_service) -> int:
+    """Recompute feature rows whose meal or mapping version changed; returns rows written.
+
+    Writes go through the caller's session and are committed by the caller.
+    """
+    allergen_mapping = mapping_service.get_mapping(db)
+    version = mapping_service.version
+
+    existing = {
+        meal_id: (h, v, u)
+        for meal_id, h, v, u in db.query(
+            MealAllergenFeatures.meal_id,
+            MealAllergenFeatures.ingredients_hash,
+            MealAllergenFeatures.mapping_version,
+            MealAllergenFeatures.meal_updated_at
+        )
+    }
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for meal_id, ingredients, meal_updated_at in db.query(Meal.id, Meal.ingredients, Meal.updated_at):
+        h = ingredients_hash(ingredients)
+        if existing.get(meal_id) == (h, version, meal_updated_at):
+            continue
+        rows.append({
+            "meal_id": meal_id,
+            "allergens": meal_allergens(allergen_mapping, ingredients),
+            "ingredients_hash": h,
+            "mapping_version": version,
+            "meal_updated_at": meal_updated_at,
+            "updated_at": now
+        })
+
+    if rows:
+        stmt = insert(MealAllergenFeatures)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MealAllergenFeatures.meal_id],
+            set_={
+                c: stmt.excluded[c]
+                for c in ("allergens", "ingredients_hash", "mapping_version", "meal_updated_at", "updated_at")
+            }
+        )
+        db.execute(stmt, rows)
+        logger.info(f"Rebuilt allergen features for {len(rows)} meals (mapping {version})")
+
+    return len(rows)
+
+
+def ensure_meal_features(db: Session, mapping_service=allergen_mapping_service) -> int:
+    """Cheap staleness check (missing rows, old mapping version or edited meals) before a full sync."""
+    mapping_service.refresh(db)
+    stale = (
+        db.query(Meal.id)
+        .outerjoin(MealAllergenFeatures, MealAllergenFeatures.meal_id == Meal.id)
+        .filter(or_(
+            MealAllergenFeatures.meal_id.is_(None),
+            MealAllergenFeatures.mapping_version != mapping_service.version,
+            MealAllergenFeatures.meal_updated_at.is_distinct_from(Meal.updated_at)
+        ))
+        .first()
+    )
+    if stale is None:
+        return 0
+    return sync_meal_features(db, mapping_service)
+
+
+def load_meal_allergens(db: Session, meal_ids):
+    # The feature table is catalog-sized and narrow, so read it whole rather than via a huge IN list
+    rows = dict(db.query(MealAllergenFeatures.meal_id, MealAllergenFeatures.allergens).all())
+    return [rows.get(meal_id) or [] for meal_id in meal_ids]
@@ -1,7 +1,112 @@
+import os
 import pickle
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, Optional
+
+from app.logic.forest_artifact import MANIFEST_FILE, is_artifact, load_artifact
+from app.logic.multilabel import wrap_models
+from app.logic.truth_table import compile_models
+
+MODEL_PATH = os.getenv("MODEL_PATH", "model/trained-models/mealPredictingModel_2025-03-31_16-04-59.pkl")
+# Optional pointer file holding the artifact to serve (a path, relative to the pointer's directory)
+MODEL_POINTER = os.getenv("MODEL_POINTER", "model/trained-models/CURRENT")
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", 5))
+
+logger = logging.getLogger(__name__)
+
+
+class LoadedModel(NamedTuple):
+    models: Any
+    version: str
+    path: str
+    loaded_at: datetime
+    stamp: tuple
+    compiled: Any = None
+
+
+class ModelRegistry:
+    """Process-wide holder of the serving model.
+
+    Callers should take one snapshot via get() per request; a reload swaps the
+    snapshot reference, so in-flight requests keep using the model they started with.
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, pointer_path: str = MODEL_POINTER,
+                 reload_interval: float = MODEL_RELOAD_INTERVAL):
+        self.model_path = model_path
+        self.pointer_path = pointer_path
+        self.reload_interval = reload_interval
+        self._current: Optional[LoadedModel] = None
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+
+    def _resolve_path(self) -> str:
+        if self.pointer_path and os.path.exists(self.pointer_path):
+            with open(self.pointer_path) as f:
+                target = f.read().strip()
+            if target:
+                return os.path.join(os.path.dirname(self.pointer_path), target)
+        return self.model_path
+
+    @staticmethod
+    def _stamp(path: str) -> tuple:
+        # Artifact directories are published by swapping in a complete directory, manifest included
+        stat = os.stat(os.path.join(path, MANIFEST_FILE) if os.path.isdir(path) else path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, path: str) -> LoadedModel:
+        stamp = self._stamp(path)
+        if is_artifact(path):
+            models = load_artifact(path)
+            version = models.version
+        else:
+            with open(path, "rb") as f:
+                models = wrap_models(pickle.load(f))
+            version = os.path.splitext(os.path.basename(path.rstrip("/")))[0]
+        try:
+            compiled = compile_models(models)
+        except Exception as e:
+            # Serving falls back to the raw forests
+            logger.error(f"Model compilation failed for {version}: {e}")
+            compiled = None
+        return LoadedModel(models, version, path, datetime.now(timezone.utc), stamp, compiled)
+
+    def load(self) -> LoadedModel:
+        with self._lock:
+            self._current = self._load(self._resolve_path())
+            self._last_check = time.monotonic()
+            logger.info(f"Loaded model {self._current.version} from {self._current.path}")
+            return self._current
+
+    def _maybe_reload(self):
+        # Only one request pays for the check; the others keep serving the current snapshot
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._last_check = time.monotonic()
+            path = self._resolve_path()
+            if self._stamp(path) == self._current.stamp:
+                return
+            self._current = self._load(path)
+            logger.info(f"Reloaded model {self._current.version} from {self._current.path}")
+        except Exception as e:
+            logger.error(f"Model reload failed, keeping {self._current.version}: {e}")
+        finally:
+            self._lock.release()
+
+    def get(self) -> LoadedModel:
+        if self._current is None:
+            return self.load()
+        if time.monotonic() - self._last_check >= self.reload_interval:
+            self._maybe_reload()
+        return self._current
+
+
+model_registry = ModelRegistry()
 
-MODEL_PATH = "model/trained-models/mealPredictingModel_2025-03-31_16-04-59.pkl"
 
 def get_model_only():
-    with open(MODEL_PATH, "rb") as f:
-        return pickle.load(f)
\ No newline at end of file
+    return model_registry.get().models
@@ -0,0 +1,306 @@
+import os
+import json
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.db import SessionLocal
+from app.models.user import User
+from app.models.user_meal_set import UserMealSet
+from app.services.catalog import get_meal_catalog
+from app.services.safe_set_cache import safe_set_cache
+from app.services.safety_index import get_safety_index
+
+# "local" runs jobs on an in-process thread pool; "redis" shares the queue and job state across processes
+REGENERATION_BACKEND = os.getenv("REGENERATION_BACKEND", "local")
+REGENERATION_WORKERS = int(os.getenv("REGENERATION_WORKERS", 2))
+REGENERATION_JOB_TTL = int(os.getenv("REGENERATION_JOB_TTL", 86400))
+# Users written per multi-row upsert (and per commit) by regenerate_meal_sets
+MEAL_SET_BATCH_SIZE = int(os.getenv("MEAL_SET_BATCH_SIZE", 500))
+
+QUEUED, RUNNING, DONE, FAILED, SUPERSEDED = "queued", "running", "done", "failed", "superseded"
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- Regeneration ----------
+
+def safe_meal_ids_for(db, user):
+    index = get_safety_index(db)
+    allergies, diet = user.allergies or [], user.preferred_diet or []
+
+    # Users sharing an allergy/diet profile share one result per model and catalog version
+    cached = safe_set_cache.get(index.version, allergies, diet)
+    if cached is not None:
+        return cached
+
+    safe_ids = set(index.safe_meal_ids(allergies).tolist())
+
+    def matches_diet(diet_type):
+        return not diet or any(d in (diet_type or []) for d in diet)
+
+    meal_ids = [meal.id for meal in get_meal_catalog(db).meals if meal.id in safe_ids and matches_diet(meal.diet_type)]
+    safe_set_cache.set(index.version, allergies, diet, meal_ids)
+    return meal_ids
+
+
+def store_meal_sets(db, meal_sets):
+    """Upsert {user_id: meal_ids} as one multi-row INSERT ... ON CONFLICT in the session's transaction."""
+    if not meal_sets:
+        return 0
+    today, now = date.today(), datetime.now(timezone.utc)
+    stmt = insert(UserMealSet).values([
+        {"user_id": user_id, "meal_ids": list(meal_ids), "date_shown": today, "updated_at": now}
+        for user_id, meal_ids in meal_sets.items()
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserMealSet.user_id],
+        set_={c: stmt.excluded[c] for c in ("meal_ids", "date_shown", "updated_at")}
+    ))
+    return len(meal_sets)
+
+
+def store_meal_set(db, user_id, meal_ids):
+    store_meal_sets(db, {user_id: meal_ids})
+
+
+def invalidate_meal_set(db, user):
+    """Drop a user's stored set in the session's transaction; predict refuses to serve until it is regenerated."""
+    db.query(UserMealSet).filter(UserMealSet.user_id == user.id).delete(synchronize_session=False)
+    user.meals_initialized = False
+
+
+def regenerate_user_meals(user_id, progress=None):
+    """Recompute and store a user's safe & diet-compatible meals; returns how many were stored."""
+    progress = progress or (lambda **fields: None)
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise ValueError(f"User {user_id} not found")
+
+        profile = (list(user.allergies or []), user.preferred_diet)
+        meal_ids = safe_meal_ids_for(db, user)
+        progress(progress=0.5, meals_generated=len(meal_ids))
+
+        # Lock the user row: a profile edited meanwhile has a newer job queued, so this result is stale
+        db.refresh(user, with_for_update=True)
+        if (list(user.allergies or []), user.preferred_diet) != profile:
+            db.rollback()
+            logger.info(f"Discarded meals for {user.email}: profile changed during regeneration")
+            return 0
+
+        store_meal_set(db, user.id, meal_ids)
+        user.meals_initialized = True
+        db.commit()
+        logger.info(f"Stored {len(meal_ids)} safe & diet-compatible meals for {user.email}")
+        return len(meal_ids)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def regenerate_meal_sets(batch_size=MEAL_SET_BATCH_SIZE):
+    """Recompute every onboarded user's stored set, e.g. after a model or allergen mapping release.
+
+    Users sharing an allergy/diet profile hit the safe-set cache, and each batch is written
+    with one multi-row upsert and committed on its own. Returns how many users were written.
+    """
+    db = SessionLocal()
+    written = 0
+    try:
+        # Every user who has filled in the health form, including ones whose last job failed
+        user_ids = [user_id for (user_id,) in db.query(User.id).filter(User.info_gathered_init == True).order_by(User.id)]
+        for start in range(0, len(user_ids), batch_size):
+            # Row locks keep a concurrent health-form edit from being overwritten with an older profile's set
+            users = db.query(User).filter(User.id.in_(user_ids[start:start + batch_size])).with_for_update().all()
+            written += store_meal_sets(db, {user.id: safe_meal_ids_for(db, user) for user in users})
+            for user in users:
+                user.meals_initialized = True
+            db.commit()
+        logger.info(f"Regenerated meal sets for {written} users")
+        return written
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# ---------- Job state ----------
+
+class LocalJobStore:
+    def __init__(self):
+        self._jobs = {}
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def save(self, job):
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def set_latest(self, user_id, job_id):
+        with self._lock:
+            self._latest[user_id] = job_id
+
+    def latest(self, user_id):
+        with self._lock:
+            return self._latest.get(user_id)
+
+
+class RedisJobStore:
+    def __init__(self, client, ttl=REGENERATION_JOB_TTL):
+        self.client = client
+        self.ttl = ttl
+
+    def save(self, job):
+        self.client.setex(f"regeneration:job:{job['job_id']}", self.ttl, json.dumps(job))
+
+    def get(self, job_id):
+        cached = self.client.get(f"regeneration:job:{job_id}")
+        return json.loads(cached) if cached else None
+
+    def set_latest(self, user_id, job_id):
+        self.client.setex(f"regeneration:latest:{user_id}", self.ttl, job_id)
+
+    def latest(self, user_id):
+        return self.client.get(f"regeneration:latest:{user_id}")
+
+
+# ---------- Queues ----------
+
+class RegenerationQueue:
+    """Runs regeneration jobs off the request path on an in-process thread pool.
+
+    Only a user's most recent job does any work; older queued jobs for the same
+    user finish as "superseded" so a burst of form edits regenerates once.
+    """
+
+    def __init__(self, store=None, workers=REGENERATION_WORKERS, work=regenerate_user_meals):
+        self.store = store or LocalJobStore()
+        self.workers = workers
+        self.work = work
+        self._executor = None
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="regeneration")
+
+    def shutdown(self, wait=False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def submit(self, user_id):
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "status": QUEUED,
+            "progress": 0.0,
+            "meals_generated": None,
+            "error": None,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+        }
+        self.store.save(job)
+        self.store.set_latest(user_id, job["job_id"])
+        self._dispatch(job["job_id"])
+        return job["job_id"]
+
+    def status(self, job_id):
+        return self.store.get(job_id)
+
+    def ensure_job(self, user_id):
+        """The user's latest job id, submitting a new job if there is none (e.g. lost on restart) or it failed."""
+        job_id = self.store.latest(user_id)
+        job = self.store.get(job_id) if job_id else None
+        if job is None or job["status"] == FAILED:
+            return self.submit(user_id)
+        return job_id
+
+    def _dispatch(self, job_id):
+        self.start()
+        self._executor.submit(self.run, job_id)
+
+    def _update(self, job, **fields):
+        job.update(fields)
+        self.store.save(job)
+
+    def run(self, job_id):
+        job = self.store.get(job_id)
+        if job is None or job["status"] != QUEUED:
+            return
+        if self.store.latest(job["user_id"]) != job_id:
+            self._update(job, status=SUPERSEDED, finished_at=datetime.now(timezone.utc).isoformat())
+            return
+
+        self._update(job, status=RUNNING)
+        try:
+            count = self.work(job["user_id"], progress=lambda **fields: self._update(job, **fields))
+            self._update(job, status=DONE, progress=1.0, meals_generated=count,
+                         finished_at=datetime.now(timezone.utc).isoformat())
+        except Exception as e:
+            logger.error(f"Regeneration job {job_id} for user {job['user_id']} failed: {e}")
+            self._update(job, status=FAILED, error=str(e), finished_at=datetime.now(timezone.utc).isoformat())
+
+
+class RedisRegenerationQueue(RegenerationQueue):
+    """Same jobs, but queued in a Redis list so any API process (or a dedicated worker) can run them."""
+
+    QUEUE_KEY = "regeneration:queue"
+
+    def __init__(self, client, workers=REGENERATION_WORKERS, work=regenerate_user_meals):
+        super().__init__(RedisJobStore(client), workers, work)
+        self.client = client
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._consume, name=f"regeneration-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, wait=False):
+        self._stop.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def _dispatch(self, job_id):
+        self.client.rpush(self.QUEUE_KEY, job_id)
+
+    def _consume(self):
+        while not self._stop.is_set():
+            try:
+                item = self.client.blpop(self.QUEUE_KEY, timeout=1)
+            except Exception as e:
+                logger.error(f"Regeneration queue unavailable: {e}")
+                self._stop.wait(1)
+                continue
+            if item:
+                self.run(item[1])
+
+
+def make_queue(backend=REGENERATION_BACKEND):
+    if backend == "redis":
+        from app.core.cache import redis_client
+        return RedisRegenerationQueue(redis_client)
+    return RegenerationQueue()
+
+
+regeneration_queue = make_queue()
@@ -0,0 +1,66 @@
+import os
+import json
+import hashlib
+import logging
+
+from app.core.cache import redis_client
+
+SAFE_SET_TTL = int(os.getenv("SAFE_SET_TTL", 86400))
+PREFIX = "safe_set"
+
+logger = logging.getLogger(__name__)
+
+
+def version_digest(version):
+    return hashlib.sha256(repr(version).encode("utf-8")).hexdigest()[:16]
+
+
+def profile_digest(allergies, diet):
+    canonical = json.dumps({"allergies": sorted(set(allergies or [])), "diet": diet or None}, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SafeSetCache:
+    """Safe meal-id lists shared by every user with the same (allergies, diet) profile.
+
+    Keys embed a digest of the (model version, catalog version) pair, so a new model or
+    catalog never reads an old entry; evict_stale() drops the old generation eagerly.
+    Redis errors are logged and treated as misses.
+    """
+
+    def __init__(self, client, ttl=SAFE_SET_TTL):
+        self.client = client
+        self.ttl = ttl
+
+    def key(self, version, allergies, diet):
+        return f"{PREFIX}:{version_digest(version)}:{profile_digest(allergies, diet)}"
+
+    def get(self, version, allergies, diet):
+        try:
+            cached = self.client.get(self.key(version, allergies, diet))
+        except Exception as e:
+            logger.warning(f"Safe set cache unavailable: {e}")
+            return None
+        return json.loads(cached) if cached is not None else None
+
+    def set(self, version, allergies, diet, meal_ids):
+        try:
+            self.client.setex(self.key(version, allergies, diet), self.ttl, json.dumps([int(i) for i in meal_ids]))
+        except Exception as e:
+            logger.warning(f"Safe set cache unavailable: {e}")
+
+    def evict_stale(self, version):
+        current = f"{PREFIX}:{version_digest(version)}:"
+        try:
+            stale = [key for key in self.client.scan_iter(match=f"{PREFIX}:*", count=1000) if not key.startswith(current)]
+            for i in range(0, len(stale), 1000):
+                self.client.delete(*stale[i:i + 1000])
+        except Exception as e:
+            logger.warning(f"Safe set cache unavailable: {e}")
+            return 0
+        if stale:
+            logger.info(f"Evicted {len(stale)} stale safe sets")
+        return len(stale)
+
+
+safe_set_cache = SafeSetCache(redis_client)
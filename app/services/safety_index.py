@@ -0,0 +1,101 @@
+import logging
+import threading
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.logic.predictor import feature_matrix_from_allergens, predict_labels
+from app.models.meal import Meal
+from app.services.catalog import catalog_version
+from app.services.meal_features import ensure_meal_features, load_meal_allergens
+from app.services.model_loader import model_registry
+from app.services.safe_set_cache import safe_set_cache
+
+logger = logging.getLogger(__name__)
+
+
+class SafetyIndex:
+    """One predicted-allergen bitmask per meal; user safety is a bitwise AND against the user's mask."""
+
+    def __init__(self, allergens, meal_ids, bits, version=None):
+        self.allergens = list(allergens)
+        self.positions = {allergen: i for i, allergen in enumerate(self.allergens)}
+        self.meal_ids = np.asarray(meal_ids, dtype=np.int64)
+        self.bits = bits
+        self.version = version
+
+    @classmethod
+    def build(cls, models, meal_ids, X, version=None, compiled=None):
+        allergens = list(models)
+        n_words = max(1, (len(allergens) + 63) // 64)
+        bits = np.zeros((len(meal_ids), n_words), dtype=np.uint64)
+        if len(meal_ids):
+            labels = predict_labels(models, X, compiled)
+            for i in range(len(allergens)):
+                bits[labels[:, i], i // 64] |= np.uint64(1 << (i % 64))
+        return cls(allergens, meal_ids, bits, version)
+
+    def user_mask(self, allergies):
+        mask = np.zeros(self.bits.shape[1], dtype=np.uint64)
+        for allergen in allergies or []:
+            i = self.positions.get(allergen)
+            if i is not None:
+                mask[i // 64] |= np.uint64(1 << (i % 64))
+        return mask
+
+    def safe_mask(self, allergies):
+        mask = self.user_mask(allergies)
+        if not mask.any():
+            return np.ones(len(self.meal_ids), dtype=bool)
+        return ~(self.bits & mask).any(axis=1)
+
+    def safe_meal_ids(self, allergies):
+        return self.meal_ids[self.safe_mask(allergies)]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def refresh_meal_features():
+    """Sync meal_allergen_features in a session of its own; the caller's transaction is left alone."""
+    db = SessionLocal()
+    try:
+        if ensure_meal_features(db):
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def get_safety_index(db: Session) -> SafetyIndex:
+    """Index for the current (model version, catalog version); rebuilt only when either changes."""
+    global _index
+    loaded = model_registry.get()
+    refresh_meal_features()
+    version = (loaded.version, loaded.stamp, catalog_version(db))
+
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if _index is not None and _index.version == version:
+            return _index
+        meal_ids = [meal_id for (meal_id,) in db.query(Meal.id).order_by(Meal.id)]
+        X = feature_matrix_from_allergens(loaded.models, load_meal_allergens(db, meal_ids))
+        compiled = None
+        if loaded.compiled is not None:
+            try:
+                # The index owns its copy: catalog patterns never leak into the registry's table
+                compiled = loaded.compiled.copy().compile(X)
+                compiled.verify(X)
+            except ValueError as e:
+                logger.error(f"Compiled model {loaded.version} failed verification, using the forests: {e}")
+                compiled = None
+        _index = SafetyIndex.build(loaded.models, meal_ids, X, version, compiled)
+        logger.info(f"Built safety index for {len(meal_ids)} meals (model {loaded.version})")
+        safe_set_cache.evict_stale(version)
+        return _index
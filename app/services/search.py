@@ -0,0 +1,160 @@
+import re
+import math
+import logging
+import threading
+from bisect import bisect_left
+from collections import Counter
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.logic.ranking import top_k
+from app.services.catalog import get_meal_catalog
+
+FIELD_WEIGHTS = {"name": 4.0, "ingredients": 3.0, "country_origin": 2.0, "instruction": 1.0}
+# Minimum trigram similarity (shared / union, as in pg_trgm) for a misspelled term to match
+TRIGRAM_THRESHOLD = 0.4
+FUZZY_EXPANSIONS = 3
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(text):
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def field_text(meal, field):
+    value = getattr(meal, field)
+    return " ".join(value) if isinstance(value, (list, tuple)) else value
+
+
+class SearchIndex:
+    """Inverted index over the meal catalog with per-field weights and trigram typo tolerance.
+
+    Each vocabulary term keeps its posting rows and a weighted term frequency per row;
+    a query term that is not in the vocabulary is expanded to its closest terms by
+    trigram similarity. A meal's score is the sum of log-damped, idf-weighted term scores.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.version = catalog.version
+        postings = {}
+        for row, meal in enumerate(catalog.meals):
+            weighted = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in tokenize(field_text(meal, field)):
+                    weighted[term] += weight
+            for term, weight in weighted.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(row)
+                postings[term][1].append(weight)
+
+        n = max(len(catalog.meals), 1)
+        self.terms = {}
+        for term, (rows, weights) in postings.items():
+            idf = math.log(1 + n / len(rows))
+            # Dampen repeats so a long instruction can't outweigh a name match
+            scores = (1 + np.log(np.asarray(weights, dtype=np.float32))) * idf
+            self.terms[term] = (np.asarray(rows, dtype=np.int64), scores.astype(np.float32))
+
+        self.vocabulary = list(self.terms)
+        self.trigram_counts = []
+        self.trigram_terms = {}
+        for i, term in enumerate(self.vocabulary):
+            grams = trigrams(term)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigram_terms.setdefault(gram, []).append(i)
+
+    def expand(self, token):
+        """[(term, similarity)] the query token matches: itself if indexed, else its nearest spellings."""
+        if token in self.terms:
+            return [(token, 1.0)]
+        grams = trigrams(token)
+        shared = Counter(i for gram in grams for i in self.trigram_terms.get(gram, ()))
+        matches = []
+        for i, count in shared.items():
+            similarity = count / (len(grams) + self.trigram_counts[i] - count)
+            if similarity >= TRIGRAM_THRESHOLD:
+                matches.append((similarity, self.vocabulary[i]))
+        matches.sort(reverse=True)
+        return [(term, similarity) for similarity, term in matches[:FUZZY_EXPANSIONS]]
+
+    def scores(self, query):
+        scores = np.zeros(len(self.catalog.meals), dtype=np.float32)
+        for token in dict.fromkeys(tokenize(query)):
+            for term, similarity in self.expand(token):
+                rows, term_scores = self.terms[term]
+                scores[rows] += term_scores * similarity
+        return scores
+
+    def search(self, query, limit=None, after=None):
+        """One page of (rows, scores) ranked by relevance, ties by meal id; after is the last (score, id) seen."""
+        scores = self.scores(query)
+        rows = np.flatnonzero(scores > 0)
+        scores = scores[rows].astype(np.float64)
+        if after is not None:
+            score, meal_id = after
+            ids = self.catalog.ids[rows]
+            keep = (scores < score) | ((scores == score) & (ids > meal_id))
+            rows, scores = rows[keep], scores[keep]
+        order = top_k(-scores, limit)
+        return rows[order], scores[order]
+
+
+class IngredientPrefixIndex:
+    """Normalized unique ingredients in sorted order with how many meals use each; prefixes are bisected."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.terms = sorted(catalog.ingredient_rows)
+        self.counts = np.array([len(catalog.ingredient_rows[term]) for term in self.terms], dtype=np.int64)
+
+    def suggest(self, prefix, limit=10):
+        """Up to limit ingredients starting with prefix, most used first (ties alphabetical)."""
+        prefix = (prefix or "").strip().lower()
+        lo = bisect_left(self.terms, prefix)
+        hi = bisect_left(self.terms, prefix[:-1] + chr(ord(prefix[-1]) + 1)) if prefix else len(self.terms)
+        order = top_k(-self.counts[lo:hi], limit)
+        return [self.terms[lo + i] for i in order]
+
+
+_index = None
+_index_lock = threading.Lock()
+_ingredient_index = None
+_ingredient_index_lock = threading.Lock()
+
+
+def get_search_index(db: Session) -> SearchIndex:
+    """Index over the current meal catalog; rebuilt when the catalog is."""
+    global _index
+    catalog = get_meal_catalog(db)
+    index = _index
+    if index is not None and index.catalog is catalog:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.catalog is not catalog:
+            _index = SearchIndex(catalog)
+            logger.info(f"Built search index over {len(catalog)} meals ({len(_index.terms)} terms)")
+        return _index
+
+
+def get_ingredient_index(db: Session) -> IngredientPrefixIndex:
+    """Prefix index over the current meal catalog; rebuilt when the catalog is."""
+    global _ingredient_index
+    catalog = get_meal_catalog(db)
+    index = _ingredient_index
+    if index is not None and index.catalog is catalog:
+        return index
+
+    with _ingredient_index_lock:
+        if _ingredient_index is None or _ingredient_index.catalog is not catalog:
+            _ingredient_index = IngredientPrefixIndex(catalog)
+            logger.info(f"Built ingredient prefix index ({len(_ingredient_index.terms)} ingredients)")
+        return _ingredient_index
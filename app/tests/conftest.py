@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+
+@pytest.fixture
+def make_models():
+    """Factory for small per-allergen forests, each learning its own binary flag with label noise."""
+
+    def make(allergens, n_rows=300, n_estimators=5, noise=0.1, seed=0):
+        rng = np.random.RandomState(seed)
+        X = pd.DataFrame(rng.randint(0, 2, (n_rows, len(allergens))), columns=allergens)
+        return {
+            allergen: RandomForestClassifier(n_estimators=n_estimators, random_state=0).fit(
+                X, (X[allergen] ^ (rng.rand(n_rows) < noise)).astype(int)
+            )
+            for allergen in allergens
+        }
+
+    return make
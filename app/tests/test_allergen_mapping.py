@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.allergen_mapping import AllergenMapping
+from app.services.allergen_mapping import AllergenMappingService
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    AllergenMapping.__table__.create(engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_in_place_update_changes_the_version():
+    db = make_session()
+    db.add_all([AllergenMapping(food="peanuts", allergen="peanut allergy"), AllergenMapping(food="milk", allergen="milk allergy")])
+    db.commit()
+
+    service = AllergenMappingService(refresh_interval=0)
+    assert service.get_mapping(db)["groundnuts"] == ["peanut allergy"]
+    before = service.version
+
+    # Same row count and max id, different content
+    db.query(AllergenMapping).filter(AllergenMapping.food == "milk").update({"allergen": "lactose intolerance"})
+    db.commit()
+
+    assert service.get_mapping(db)["dairy"] == ["lactose intolerance"]
+    assert service.version != before
+
+
+def test_unchanged_table_keeps_the_version():
+    db = make_session()
+    db.add(AllergenMapping(food="eggs", allergen="egg allergy"))
+    db.commit()
+
+    service = AllergenMappingService(refresh_interval=0)
+    mapping = service.get_mapping(db)
+    version = service.version
+    assert service.get_mapping(db) is mapping
+    assert service.version == version
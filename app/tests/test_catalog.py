@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+from datetime import datetime
+
+from app.models.meal import Meal
+from app.services import catalog as catalog_module
+from app.services.catalog import MealCatalog, get_meal_catalog
+
+
+def make_catalog():
+    meals = [
+        Meal(id=3, name="Beef Stew", instruction="", total_calories=700, fats=30, carbs=40, protein=50,
+             diet_type=["High-Protein"], meal_cooking_time="90 min", meal_cooking_method=["Simmer"],
+             ingredients=["beef", "Carrot"], meal_type="Dinner"),
+        Meal(id=1, name="Tofu Bowl", instruction="", total_calories=450, fats=15, carbs=50, protein=25,
+             diet_type=["Vegan"], meal_cooking_time="20 min", meal_cooking_method=["Stir-Fry"],
+             ingredients=["tofu", "soy sauce"], meal_type="Lunch"),
+        Meal(id=2, name="Omelette", instruction="", total_calories=None, fats=20, carbs=2, protein=18,
+             diet_type=["Vegetarian", "Keto"], meal_cooking_time="quick", meal_cooking_method=["Fry"],
+             ingredients=["egg", "butter"], meal_type="breakfast"),
+    ]
+    return MealCatalog(meals, version="v1")
+
+
+def ids(catalog, mask):
+    return catalog.ids[mask].tolist()
+
+
+def test_rows_are_ordered_by_id():
+    catalog = make_catalog()
+    assert catalog.ids.tolist() == [1, 2, 3]
+    assert catalog.record(2).name == "Omelette"
+    assert catalog.record(9) is None
+
+
+def test_filters_compile_to_masks():
+    catalog = make_catalog()
+    assert ids(catalog, catalog.mask(meal_type=" DINNER")) == [3]
+    assert ids(catalog, catalog.mask(diet_type="keto")) == [2]
+    assert ids(catalog, catalog.mask(cooking_methods=["fry", "simmer"])) == [2, 3]
+    assert ids(catalog, catalog.mask(max_cooking_minutes=30)) == [1]
+    assert ids(catalog, catalog.mask(excluded_ingredients=["Carrot", "EGG"])) == [1]
+    assert ids(catalog, catalog.mask(min_calories=400, max_calories=500)) == [1]
+    assert ids(catalog, catalog.mask(meal_type="brunch")) == []
+    assert ids(catalog, catalog.mask()) == [1, 2, 3]
+
+
+def test_membership_restricts_to_user_set():
+    catalog = make_catalog()
+    mask = catalog.membership([3, 2, 99]) & catalog.mask(max_calories=1000)
+    assert ids(catalog, mask) == [3]
+    assert np.array_equal(catalog.rows([3, 1]), [0, 2])
+
+
+class FakeSession:
+    """Answers the catalog's version and load queries from a list of meals."""
+
+    def __init__(self, meals):
+        self.meals = meals
+
+    def query(self, *columns):
+        return self
+
+    def order_by(self, *columns):
+        return self
+
+    def all(self):
+        return list(self.meals)
+
+    def one(self):
+        return len(self.meals), max(m.id for m in self.meals), max(m.updated_at for m in self.meals)
+
+    def scalar(self):
+        return None
+
+
+def test_editing_a_meal_reloads_the_catalog(monkeypatch):
+    monkeypatch.setattr(catalog_module, "CATALOG_REFRESH_INTERVAL", 0)
+    monkeypatch.setattr(catalog_module, "_catalog", None)
+    meals = [
+        Meal(id=1, name="Tofu Bowl", instruction="", total_calories=450, ingredients=["tofu"], updated_at=datetime(2026, 1, 1)),
+        Meal(id=2, name="Omelette", instruction="", total_calories=300, ingredients=["egg"], updated_at=datetime(2026, 1, 2)),
+    ]
+    db = FakeSession(meals)
+    first = get_meal_catalog(db)
+    assert get_meal_catalog(db) is first
+
+    # Same count and max id; only the trigger-maintained updated_at moves
+    meals[0].name = "Tofu Rice Bowl"
+    meals[0].updated_at = datetime(2026, 1, 3)
+    second = get_meal_catalog(db)
+
+    assert second is not first
+    assert second.version != first.version
+    assert second.record(1).name == "Tofu Rice Bowl"
@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+from sklearn.dummy import DummyClassifier
+from sklearn.ensemble import RandomForestClassifier
+
+from app.logic import compression
+from app.logic.compression import compress_forest, compress_models, min_recall
+from app.logic.multilabel import MultiLabelModels
+
+ALLERGENS = ["soy allergy", "peanut allergy"]
+
+
+def make_data(seed=0, n=400):
+    rng = np.random.RandomState(seed)
+    X = pd.DataFrame(rng.randint(0, 2, (n, len(ALLERGENS))), columns=ALLERGENS)
+    return X, X.astype(bool)
+
+
+def test_compressed_forests_keep_recall_and_shrink():
+    X, y = make_data()
+    X_val, y_val = make_data(1, 200)
+    X_test, y_test = make_data(2, 200)
+    models = {a: RandomForestClassifier(n_estimators=200, random_state=0).fit(X, y[a]) for a in ALLERGENS}
+
+    compressed, reports = compress_models(models, X, X_val, y_val, X_test, y_test, tolerance=0.0)
+
+    for allergen in ALLERGENS:
+        report = reports[allergen]
+        assert report["size_after"] < report["size_before"]
+        assert min_recall(y_val[allergen], compressed[allergen].predict(X_val)) >= min_recall(y_val[allergen], models[allergen].predict(X_val))
+        assert min_recall(y_test[allergen], compressed[allergen].predict(X_test)) == report["recall_after"]
+
+
+def test_all_positive_candidate_is_rejected(monkeypatch):
+    X, y = make_data()
+    X_val, y_val = make_data(1, 200)
+    clf = RandomForestClassifier(n_estimators=50, random_state=0).fit(X, y[ALLERGENS[0]])
+    always_positive = DummyClassifier(strategy="constant", constant=True).fit(X, y[ALLERGENS[0]])
+    monkeypatch.setattr(compression, "candidates", lambda clf, X_train: [("always_positive", lambda: always_positive)])
+
+    best, report = compress_forest(clf, X, X_val, y_val[ALLERGENS[0]], X_val, y_val[ALLERGENS[0]])
+
+    # Perfect recall, but every negative becomes a false positive
+    assert min_recall(y_val[ALLERGENS[0]], always_positive.predict(X_val)) == 1.0
+    assert best is clf
+    assert report["method"] == "original"
+
+
+def test_multi_label_layout_is_preserved():
+    X, y = make_data()
+    models = MultiLabelModels(RandomForestClassifier(n_estimators=50, random_state=0).fit(X, y), ALLERGENS)
+
+    compressed, reports = compress_models(models, X, X, y, X, y)
+
+    assert isinstance(compressed, MultiLabelModels)
+    assert list(compressed) == ALLERGENS
+    assert reports["multi_label"]["size_after"] <= reports["multi_label"]["size_before"]
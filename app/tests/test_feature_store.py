@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.logic.feature_store import cache_key, load_or_build
+from app.logic.features import build_features_and_labels
+
+ALLERGENS = ["peanut allergy", "milk allergy"]
+MAPPING = {"peanuts": ["peanut allergy"], "milk": ["milk allergy"]}
+
+
+def test_roundtrip_and_reuse(tmp_path):
+    source = tmp_path / "meals.csv"
+    source.write_text("ingredients\npeanuts, milk\n")
+    calls = []
+
+    def build():
+        calls.append(1)
+        X, y = build_features_and_labels([["peanuts", "milk"], ["bread"]], MAPPING, ALLERGENS)
+        return {"X": X, "y": y}
+
+    key = cache_key([str(source)], MAPPING, ALLERGENS)
+    first = load_or_build(key, build, cache_dir=str(tmp_path / "cache"))
+    second = load_or_build(key, build, cache_dir=str(tmp_path / "cache"))
+
+    assert len(calls) == 1
+    assert list(second["X"].columns) == ALLERGENS
+    assert second["X"].equals(first["X"])
+    assert second["y"].equals(first["y"])
+
+
+def test_key_tracks_sources_and_mapping(tmp_path):
+    source = tmp_path / "meals.csv"
+    source.write_text("ingredients\npeanuts\n")
+    key = cache_key([str(source)], MAPPING, ALLERGENS)
+
+    assert cache_key([str(source)], {**MAPPING, "butter": ["milk allergy"]}, ALLERGENS) != key
+    source.write_text("ingredients\nmilk\n")
+    assert cache_key([str(source)], MAPPING, ALLERGENS) != key
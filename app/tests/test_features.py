@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+
+from app.logic.features import build_features_and_labels
+from app.services.allergen_mapping import enhance_mapping
+
+ALLERGENS = ["soy allergy", "peanut allergy", "milk allergy", "latex allergy"]
+
+
+def naive_features(ingredients, allergen_mapping, allergens):
+    features = {allergen: 0 for allergen in allergens}
+    for ingredient in ingredients:
+        for allergen in allergen_mapping.get(ingredient, []):
+            if allergen in features:
+                features[allergen] = 1
+    return [features[a] for a in allergens]
+
+
+def test_matches_per_meal_builder():
+    rng = np.random.RandomState(0)
+    base = {f"food{i}": list(rng.choice(ALLERGENS[:3], rng.randint(0, 3), replace=False)) for i in range(30)}
+    base["peanuts"] = ["peanut allergy"]
+    allergen_mapping = enhance_mapping(base)
+    foods = sorted(allergen_mapping) + ["unmapped"]
+    meals = [", ".join(rng.choice(foods, rng.randint(1, 5))).upper() for _ in range(100)] + ["", None]
+    meals.append(["Peanut Butter ", "bananas"])
+
+    X, y = build_features_and_labels(meals, allergen_mapping, ALLERGENS)
+
+    expected = [
+        naive_features([i.strip().lower() for i in (m.split(",") if isinstance(m, str) else m or [])], allergen_mapping, ALLERGENS)
+        for m in meals
+    ]
+    assert X.values.tolist() == expected
+    assert (y.values == X.values.astype(bool)).all()
+    assert X.iloc[-1].tolist() == [0, 1, 0, 1]
+
+
+def test_mapping_lists_are_not_mutated():
+    allergen_mapping = enhance_mapping({"bananas": ["fruit allergy"]})
+    before = {food: list(allergens) for food, allergens in allergen_mapping.items()}
+    build_features_and_labels([["bananas"], ["bananas", "avocados"]], allergen_mapping, ALLERGENS)
+    assert allergen_mapping == before
@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from app.logic.forest_artifact import export_models, is_artifact, load_artifact
+from app.logic.multilabel import MultiLabelModels, wrap_models
+from app.logic.truth_table import compile_models
+from app.services.model_loader import ModelRegistry
+
+ALLERGENS = ["soy allergy", "peanut allergy", "milk allergy"]
+
+
+def artifact_models(make_models):
+    models = make_models(ALLERGENS, n_estimators=7, noise=0.2)
+    # Constant label: replace the last forest with a single-class one
+    X = pd.DataFrame(np.random.RandomState(0).randint(0, 2, (300, len(ALLERGENS))), columns=ALLERGENS)
+    models[ALLERGENS[-1]] = RandomForestClassifier(n_estimators=3, random_state=0).fit(X, np.zeros(300, dtype=int))
+    return models
+
+
+def test_mapped_forests_match_sklearn(tmp_path, make_models):
+    models = artifact_models(make_models)
+    path = export_models(models, str(tmp_path / "model_v1"), version="v1")
+    assert is_artifact(path)
+
+    mapped = load_artifact(path)
+    assert mapped.version == "v1"
+    assert list(mapped) == ALLERGENS
+
+    X = pd.DataFrame(np.random.RandomState(1).randint(0, 2, (500, len(ALLERGENS))), columns=ALLERGENS)
+    for allergen, clf in models.items():
+        assert (mapped[allergen].predict(X) == clf.predict(X).astype(int)).all()
+        assert isinstance(mapped[allergen].left, np.memmap)
+
+
+def test_registry_serves_artifact_directory(tmp_path, make_models):
+    path = export_models(artifact_models(make_models), str(tmp_path / "model_v2"), version="v2")
+    (tmp_path / "CURRENT").write_text("model_v2\n")
+
+    loaded = ModelRegistry(str(tmp_path / "missing.pkl"), str(tmp_path / "CURRENT"), 0).get()
+    assert loaded.version == "v2"
+    assert loaded.path.endswith("model_v2")
+    assert loaded.compiled is not None
+
+
+def test_multi_label_artifact_matches_sklearn(tmp_path):
+    rng = np.random.RandomState(2)
+    X = pd.DataFrame(rng.randint(0, 2, (300, len(ALLERGENS))), columns=ALLERGENS)
+    y = X.astype(bool).copy()
+    y[ALLERGENS[-1]] = False
+    clf = RandomForestClassifier(n_estimators=7, random_state=0).fit(X, y)
+    models = MultiLabelModels(clf, ALLERGENS)
+
+    mapped = load_artifact(export_models(models, str(tmp_path / "model_ml"), version="ml"))
+    assert isinstance(mapped, MultiLabelModels)
+    assert list(mapped) == ALLERGENS
+
+    X_new = pd.DataFrame(rng.randint(0, 2, (200, len(ALLERGENS))), columns=ALLERGENS)
+    assert (mapped.predict_labels(X_new) == models.predict_labels(X_new)).all()
+    assert (mapped[ALLERGENS[0]].predict(X_new) == clf.predict(X_new)[:, 0].astype(int)).all()
+    # Load-time verification reads the multi-output probabilities of both layouts
+    assert len(compile_models(mapped).table) == len(compile_models(models).table) == 2 ** len(ALLERGENS)
+
+
+def test_multi_label_pickle_is_wrapped():
+    clf = RandomForestClassifier(n_estimators=3, random_state=0)
+    models = wrap_models({"layout": "multi_label", "allergens": ALLERGENS, "model": clf})
+    assert isinstance(models, MultiLabelModels)
+    assert list(models) == ALLERGENS
@@ -0,0 +1,17 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.utils.helpers import normalize_terms, parse_cooking_minutes
+
+
+def test_parse_cooking_minutes():
+    assert parse_cooking_minutes("25 mins") == 25
+    assert parse_cooking_minutes("quick") is None
+    assert parse_cooking_minutes(None) is None
+    assert parse_cooking_minutes("9" * 12) is None
+
+
+def test_normalize_terms():
+    assert normalize_terms([" Tofu", "Soy Sauce ", None]) == ["tofu", "soy sauce"]
+    assert normalize_terms(None) == []
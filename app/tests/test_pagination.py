@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.pagination import MAX_PAGE_SIZE, cursor_scope, decode_cursor, encode_cursor, page_size
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor((0.25, 42), "predict:fit:False")
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "predict:fit:False", types=((int, float), int)) == [0.25, 42]
+    assert decode_cursor(None, "search") is None
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor((1,), "favorites"), encode_cursor(("1",), "search")])
+def test_foreign_or_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor, "search")
+    assert e.value.status_code == 400
+
+
+def test_page_size_is_capped():
+    assert page_size(None) > 0
+    assert page_size(10) == 10
+    assert page_size(MAX_PAGE_SIZE * 10) == MAX_PAGE_SIZE
+
+
+def test_cursor_is_bound_to_the_filters_it_was_issued_for():
+    filters = {"meal_type": "dinner", "sort_by": "fit", "meals_per_day": 3}
+    scope = cursor_scope("predict", filters, [600.0, 40.0, 70.0, 20.0])
+    cursor = encode_cursor((0.5, 7), scope)
+
+    assert cursor_scope("predict", dict(filters), [600.0, 40.0, 70.0, 20.0]) == scope
+    assert decode_cursor(cursor, scope, types=((int, float), int)) == [0.5, 7]
+    for other in (
+        cursor_scope("predict", {**filters, "meals_per_day": 4}, [450.0, 30.0, 52.5, 15.0]),
+        cursor_scope("predict", {**filters, "meal_type": "lunch"}, [600.0, 40.0, 70.0, 20.0]),
+    ):
+        with pytest.raises(HTTPException):
+            decode_cursor(cursor, other, types=((int, float), int))
@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+from types import SimpleNamespace
+
+from app.logic.ranking import fit_distance, meal_targets, rank_rows, top_k
+
+
+def test_top_k_matches_full_sort():
+    rng = np.random.RandomState(0)
+    scores = rng.randint(0, 20, 500).astype(float)
+    expected = np.lexsort((np.arange(500), scores))
+    for k in (1, 7, 50, 499, 500, 1000):
+        assert np.array_equal(top_k(scores, k), expected[:k])
+    assert len(top_k(scores, 0)) == 0
+
+
+def test_fit_prefers_meals_near_per_meal_targets():
+    targets = meal_targets(2100, 150, 210, 70, meals_per_day=3)
+    values = np.array([
+        [700, 50, 70, 23],
+        [1400, 50, 70, 23],
+        [np.nan, 50, 70, 23],
+        [650, 45, 75, 20],
+    ])
+    distance = fit_distance(values, targets)
+    assert np.argsort(distance).tolist() == [0, 3, 1, 2]
+    assert np.isinf(distance[2])
+    assert np.array_equal(fit_distance(values, np.zeros(4)), np.zeros(4))
+
+
+def test_rank_rows_sort_keys_and_limit():
+    catalog = SimpleNamespace(
+        ids=np.array([1, 2, 3, 4]),
+        calories=np.array([500.0, 300.0, np.nan, 800.0]),
+        protein=np.array([10.0, 40.0, 20.0, 30.0]),
+        carbs=np.zeros(4),
+        fats=np.zeros(4),
+    )
+    rows = np.array([0, 1, 2, 3])
+    assert rank_rows(catalog, rows, limit=2)[0].tolist() == [0, 1]
+    assert rank_rows(catalog, rows, "calories")[0].tolist() == [1, 0, 3, 2]
+    assert rank_rows(catalog, rows, "calories", descending=True, limit=2)[0].tolist() == [3, 0]
+    assert rank_rows(catalog, rows[[0, 2, 3]], "protein", descending=True)[0].tolist() == [3, 2, 0]
+
+
+def test_keyset_pages_cover_every_row_once():
+    rng = np.random.RandomState(3)
+    n = 103
+    catalog = SimpleNamespace(ids=np.arange(10, 10 + n), calories=rng.randint(0, 5, n).astype(float),
+                              protein=np.zeros(n), carbs=np.zeros(n), fats=np.zeros(n))
+    rows = np.arange(n)
+    full = rank_rows(catalog, rows, "calories")[0].tolist()
+
+    seen, after = [], None
+    while True:
+        page, scores = rank_rows(catalog, rows, "calories", limit=10, after=after)
+        if not len(page):
+            break
+        seen.extend(page.tolist())
+        after = (scores[-1], catalog.ids[page[-1]])
+    assert seen == full
@@ -0,0 +1,177 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import threading
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes import predict as predict_routes
+from app.api.routes import user as user_routes
+from app.core.security import SECRET_KEY
+from app.models.user import User
+from app.models.user_meal_set import UserMealSet
+from app.schemas.request import PredictRequest
+from app.schemas.user import UserProfile
+
+from app.services.regeneration import DONE, FAILED, QUEUED, SUPERSEDED, RegenerationQueue, store_meal_sets
+
+
+def test_job_reports_progress_and_count():
+    def work(user_id, progress):
+        progress(progress=0.5, meals_generated=7)
+        return 7
+
+    queue = RegenerationQueue(work=work)
+    job_id = queue.submit(user_id=1)
+    queue.shutdown(wait=True)
+
+    job = queue.status(job_id)
+    assert job["status"] == DONE
+    assert job["meals_generated"] == 7
+    assert job["progress"] == 1.0
+    assert job["finished_at"] is not None
+
+
+def test_newer_job_supersedes_queued_one():
+    release = threading.Event()
+    calls = []
+
+    def work(user_id, progress):
+        release.wait(5)
+        calls.append(user_id)
+        return 0
+
+    queue = RegenerationQueue(workers=1, work=work)
+    blocker = queue.submit(user_id=99)
+    first = queue.submit(user_id=1)
+    second = queue.submit(user_id=1)
+    assert queue.status(first)["status"] == QUEUED
+
+    release.set()
+    queue.shutdown(wait=True)
+
+    assert queue.status(blocker)["status"] == DONE
+    assert queue.status(first)["status"] == SUPERSEDED
+    assert queue.status(second)["status"] == DONE
+    assert calls == [99, 1]
+
+
+def test_failed_job_keeps_error():
+    def work(user_id, progress):
+        raise ValueError("boom")
+
+    queue = RegenerationQueue(work=work)
+    job_id = queue.submit(user_id=1)
+    queue.shutdown(wait=True)
+
+    job = queue.status(job_id)
+    assert job["status"] == FAILED
+    assert job["error"] == "boom"
+
+
+
+def test_meal_sets_are_written_as_one_multi_row_upsert():
+    executed = []
+    db = SimpleNamespace(execute=executed.append)
+
+    assert store_meal_sets(db, {1: [3, 5], 2: [], 7: [9]}) == 3
+    assert store_meal_sets(db, {}) == 0
+
+    assert len(executed) == 1
+    sql = str(executed[0].compile(dialect=postgresql.dialect()))
+    assert sql.count("INSERT") == 1
+    assert "ON CONFLICT (user_id) DO UPDATE" in sql
+    assert sql.count("%(user_id_m") == 3
+
+
+class FakeSession:
+    """Rows per model; understands the equality filters, first/scalar/delete and commit the routes use."""
+
+    def __init__(self, *rows):
+        self.rows = list(rows)
+
+    def query(self, entity):
+        return FakeQuery(self, entity)
+
+    def commit(self):
+        pass
+
+    def refresh(self, obj, **kwargs):
+        pass
+
+
+class FakeQuery:
+    def __init__(self, db, entity):
+        self.db, self.entity, self.conditions = db, entity, []
+        self.model = getattr(entity, "class_", entity)
+
+    def filter(self, *conditions):
+        self.conditions += [(c.left.key, c.right.value) for c in conditions]
+        return self
+
+    def _matches(self):
+        return [
+            row for row in self.db.rows
+            if isinstance(row, self.model) and all(getattr(row, k) == v for k, v in self.conditions)
+        ]
+
+    def first(self):
+        matches = self._matches()
+        return matches[0] if matches else None
+
+    def scalar(self):
+        row = self.first()
+        return getattr(row, self.entity.key) if row is not None else None
+
+    def delete(self, synchronize_session=None):
+        matches = self._matches()
+        self.db.rows = [row for row in self.db.rows if row not in matches]
+        return len(matches)
+
+
+def test_predict_refuses_the_old_set_while_regenerating(monkeypatch):
+    release = threading.Event()
+
+    def work(user_id, progress):
+        release.wait(5)
+        return 0
+
+    queue = RegenerationQueue(workers=1, work=work)
+    monkeypatch.setattr(user_routes, "regeneration_queue", queue)
+    monkeypatch.setattr(predict_routes, "regeneration_queue", queue)
+
+    user = User(id=1, email="a@example.com", name="A", birthdate=datetime(1990, 1, 1), allergies=[], meals_initialized=True)
+    db = FakeSession(user, UserMealSet(user_id=1, meal_ids=[1, 2, 3]))
+    token = jwt.encode({"sub": user.email}, SECRET_KEY, algorithm="HS256")
+    request = SimpleNamespace(headers={"Authorization": f"Bearer {token}"})
+
+    response = user_routes.update_health_form(UserProfile(allergies=["Peanut Allergy"]), request, db)
+
+    assert user.allergies == ["peanut allergy"]
+    assert db.query(UserMealSet.meal_ids).filter(UserMealSet.user_id == 1).scalar() is None
+    with pytest.raises(HTTPException) as e:
+        predict_routes.predict_meals(PredictRequest(user_id=1), db)
+    assert e.value.status_code == 409
+    assert e.value.detail["regeneration_job_id"] == response["regeneration_job_id"]
+
+    release.set()
+    queue.shutdown(wait=True)
+
+
+def test_failed_or_lost_job_is_resubmitted():
+    def work(user_id, progress):
+        raise ValueError("boom")
+
+    queue = RegenerationQueue(work=work)
+    first = queue.ensure_job(1)
+    queue.shutdown(wait=True)
+    assert queue.status(first)["status"] == FAILED
+
+    second = queue.ensure_job(1)
+    assert second != first
+    queue.shutdown(wait=True)
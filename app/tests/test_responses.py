@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.meal import Meal
+from app.schemas.predict import MealDetailResponse, MealItem, MealSearchResult
+from app.schemas.user import FavoriteMeal
+from app.utils.responses import MealFragmentCache, json_list_response, meal_item, meal_search_result
+
+MEALS = [
+    Meal(id=i, name=f"Meal {i}", instruction="Cook.", total_calories=100.0 * i, fats=1.0, carbs=2.0, protein=3.0,
+         diet_type=["vegan"], meal_difficulty="easy", meal_cooking_time="10 min", meal_cooking_method=["bake"],
+         country_origin="Italy", ingredients=["salt", "pepper"], meal_type="lunch")
+    for i in range(1, 8)
+]
+
+
+def test_shapes_match_response_schemas():
+    meal = MEALS[0]
+    for schema in (MealItem, FavoriteMeal, MealDetailResponse):
+        assert schema(**meal_item(meal)).model_dump() == meal_item(meal)
+    assert MealSearchResult(**meal_search_result(meal)).model_dump() == meal_search_result(meal)
+    assert meal_item(meal)["ingredients"] == "salt, pepper"
+
+
+def test_list_and_envelope_bodies():
+    app = FastAPI()
+
+    @app.get("/list")
+    def listing():
+        return json_list_response(MEALS, meal_item, headers={"X-Next-Cursor": "abc"})
+
+    @app.get("/envelope")
+    def envelope():
+        return json_list_response(iter(MEALS), meal_item, envelope={"total": 7, "next_cursor": None}, key="meals")
+
+    client = TestClient(app)
+    listed, nested = client.get("/list"), client.get("/envelope")
+
+    assert listed.headers["content-type"] == nested.headers["content-type"] == "application/json"
+    assert listed.headers["X-Next-Cursor"] == "abc"
+    assert json.loads(listed.content) == [meal_item(meal) for meal in MEALS]
+    assert json.loads(nested.content) == {"total": 7, "next_cursor": None, "meals": json.loads(listed.content)}
+
+
+def test_fragment_cache_reuses_bytes_within_a_catalog_version():
+    calls = []
+
+    def render(meal):
+        calls.append(meal.id)
+        return meal_item(meal)
+
+    cache = MealFragmentCache(max_entries=5)
+    encode = cache.encoder("v1", "meal_item", render)
+    first = [encode(meal) for meal in MEALS[:3]]
+    assert [encode(meal) for meal in MEALS[:3]] == first
+    assert calls == [1, 2, 3]
+    assert json.loads(first[0]) == meal_item(MEALS[0])
+
+    # Other shapes are separate entries; the cap stops storing but still encodes
+    search = cache.encoder("v1", "meal_search_result", meal_search_result)
+    assert "ingredients" not in json.loads(search(MEALS[0]))
+    [encode(meal) for meal in MEALS]
+    assert len(cache) == 5
+
+    cache.encoder("v2", "meal_item", render)(MEALS[0])
+    assert len(cache) == 1
+    assert calls[-1] == 1
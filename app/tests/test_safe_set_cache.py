@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import fnmatch
+
+from app.services.safe_set_cache import SafeSetCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def scan_iter(self, match=None, count=None):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def test_profile_is_order_insensitive():
+    cache = SafeSetCache(FakeRedis())
+    version = ("model-a", "3-3-none")
+    cache.set(version, ["milk allergy", "egg allergy"], "vegan", [1, 2, 3])
+
+    assert cache.get(version, ["egg allergy", "milk allergy", "egg allergy"], "vegan") == [1, 2, 3]
+    assert cache.get(version, ["egg allergy"], "vegan") is None
+    assert cache.get(version, ["milk allergy", "egg allergy"], "keto") is None
+
+
+def test_new_version_misses_and_evicts_old_generation():
+    client = FakeRedis()
+    cache = SafeSetCache(client)
+    old, new = ("model-a", "3-3-none"), ("model-b", "3-3-none")
+    cache.set(old, ["milk allergy"], None, [1])
+    cache.set(new, ["milk allergy"], None, [2])
+
+    assert cache.get(new, ["milk allergy"], None) == [2]
+    assert cache.evict_stale(new) == 1
+    assert cache.get(old, ["milk allergy"], None) is None
+    assert cache.get(new, ["milk allergy"], None) == [2]
+
+
+def test_redis_errors_are_misses():
+    class Down:
+        def get(self, key):
+            raise ConnectionError("down")
+
+        def setex(self, key, ttl, value):
+            raise ConnectionError("down")
+
+    cache = SafeSetCache(Down())
+    cache.set(("m", "c"), [], None, [1])
+    assert cache.get(("m", "c"), [], None) is None
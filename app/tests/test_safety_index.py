@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from sklearn.ensemble import RandomForestClassifier
+
+from app.logic.multilabel import MultiLabelModels
+from app.logic.predictor import build_feature_matrix, predict_safe_meals
+from app.services.safety_index import SafetyIndex
+
+ALLERGENS = ["soy allergy", "peanut allergy", "milk allergy", "egg allergy"]
+
+
+def make_meals(allergen_mapping, n=200):
+    rng = np.random.RandomState(1)
+    foods = sorted(allergen_mapping)
+    return [SimpleNamespace(id=i, ingredients=list(rng.choice(foods, 3))) for i in range(n)]
+
+
+def test_safe_meal_ids_match_predict_safe_meals(make_models):
+    rng = np.random.RandomState(2)
+    allergen_mapping = {f"food{i}": list(rng.choice(ALLERGENS, rng.randint(0, 3), replace=False)) for i in range(40)}
+    models = make_models(ALLERGENS)
+    meals = make_meals(allergen_mapping)
+    X = build_feature_matrix(models, allergen_mapping, meals)
+    index = SafetyIndex.build(models, [m.id for m in meals], X)
+
+    for allergies in ([], ["soy allergy"], ["peanut allergy", "milk allergy", "unknown"], ALLERGENS):
+        expected = [m.id for m in predict_safe_meals(models, allergen_mapping, meals, {"allergies": allergies})]
+        assert index.safe_meal_ids(allergies).tolist() == expected
+
+
+def test_multi_label_models_give_the_same_safe_set():
+    rng = np.random.RandomState(3)
+    allergen_mapping = {f"food{i}": list(rng.choice(ALLERGENS, rng.randint(0, 3), replace=False)) for i in range(40)}
+    X_train = pd.DataFrame(rng.randint(0, 2, (300, len(ALLERGENS))), columns=ALLERGENS)
+    clf = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train, X_train.astype(bool))
+    models = MultiLabelModels(clf, ALLERGENS)
+    per_allergen = {allergen: models[allergen] for allergen in ALLERGENS}
+
+    meals = make_meals(allergen_mapping)
+    X = build_feature_matrix(models, allergen_mapping, meals)
+    index = SafetyIndex.build(models, [m.id for m in meals], X)
+
+    for allergies in (["soy allergy"], ["milk allergy", "egg allergy"]):
+        expected = [m.id for m in predict_safe_meals(per_allergen, allergen_mapping, meals, {"allergies": allergies})]
+        assert [m.id for m in predict_safe_meals(models, allergen_mapping, meals, {"allergies": allergies})] == expected
+        assert index.safe_meal_ids(allergies).tolist() == expected
@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import time
+import numpy as np
+from types import SimpleNamespace
+
+from app.services.catalog import MealCatalog, MealRecord
+from app.services.search import IngredientPrefixIndex, SearchIndex
+
+LATENCY_BUDGET_MS = 25
+
+
+def make_meal(id, name, ingredients=(), origin=None, instruction=""):
+    fields = dict.fromkeys(MealRecord._fields)
+    fields.update(id=id, name=name, ingredients=list(ingredients), country_origin=origin, instruction=instruction)
+    return SimpleNamespace(**fields)
+
+
+def names(index, rows):
+    return [index.catalog.meals[i].name for i in rows]
+
+
+def make_index():
+    return SearchIndex(MealCatalog([
+        make_meal(1, "Chicken Curry", ["chicken", "curry paste", "rice"], "India", "Simmer the chicken."),
+        make_meal(2, "Vegetable Stir Fry", ["broccoli", "soy sauce"], "China", "Add chicken stock if you like."),
+        make_meal(3, "Chicken Tacos", ["chicken", "tortilla"], "Mexico", "Grill and assemble."),
+        make_meal(4, "Lentil Soup", ["lentils", "carrot"], "Turkey", "Simmer until soft."),
+    ]))
+
+
+def test_name_and_ingredient_matches_outrank_instruction_mentions():
+    index = make_index()
+    rows, scores = index.search("chicken")
+    assert names(index, rows) == ["Chicken Curry", "Chicken Tacos", "Vegetable Stir Fry"]
+    assert scores[0] >= scores[1] > scores[2]
+
+
+def test_typos_match_by_trigram_similarity():
+    index = make_index()
+    assert names(index, index.search("chiken")[0])[:2] == ["Chicken Curry", "Chicken Tacos"]
+    assert names(index, index.search("lentl soop")[0]) == ["Lentil Soup"]
+    assert len(index.search("zzzz")[0]) == 0
+
+
+def test_pages_follow_relevance_order():
+    index = make_index()
+    full = index.search("chicken")[0].tolist()
+    first, scores = index.search("chicken", limit=2)
+    after = (scores[-1], index.catalog.ids[first[-1]])
+    rest = index.search("chicken", limit=2, after=after)[0]
+    assert first.tolist() + rest.tolist() == full
+
+
+def test_search_latency_on_large_catalog():
+    rng = np.random.RandomState(0)
+    words = [f"{a}{b}" for a in ("ka", "lo", "mi", "pe", "ru", "sa", "te", "vo") for b in ("ban", "cor", "dil", "fen", "gar", "hum", "jus", "kel")]
+    picks = rng.randint(0, len(words), (50000, 52))
+    meals = [
+        make_meal(i, " ".join(words[j] for j in row[:3]), [words[j] for j in row[3:11]], words[row[11]],
+                  " ".join(words[j] for j in row[12:]))
+        for i, row in enumerate(picks)
+    ]
+    index = SearchIndex(MealCatalog(meals))
+
+    queries = [f"{words[a]} {words[b]}" for a, b in rng.randint(0, len(words), (30, 2))] + ["kaban lodl", "sacorr"]
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, limit=20)
+        timings.append((time.perf_counter() - start) * 1000)
+    assert np.percentile(timings, 95) < LATENCY_BUDGET_MS
+
+
+def test_ingredient_suggestions_ranked_by_popularity():
+    index = IngredientPrefixIndex(MealCatalog([
+        make_meal(1, "a", ["Soy Sauce", "sugar", "salt"]),
+        make_meal(2, "b", ["salt", "sugar"]),
+        make_meal(3, "c", ["salt", "spinach", "tofu"]),
+    ]))
+    assert index.suggest("s") == ["salt", "sugar", "soy sauce", "spinach"]
+    assert index.suggest(" S", limit=2) == ["salt", "sugar"]
+    assert index.suggest("so") == ["soy sauce"]
+    assert index.suggest("x") == []
+    assert index.suggest("")[:1] == ["salt"]
@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.logic import truth_table
+from app.logic.predictor import predict_labels
+from app.logic.truth_table import CompiledModels, compile_models
+
+
+def allergens(n_features):
+    return [f"allergen {i}" for i in range(n_features)]
+
+
+def test_enumerated_table_matches_forests(make_models):
+    models = make_models(allergens(6), n_rows=400)
+    compiled = compile_models(models)
+    assert len(compiled.table) == 2 ** 6
+
+    X = pd.DataFrame(np.random.RandomState(3).randint(0, 2, (500, 6)), columns=list(models))
+    assert (compiled.predict_labels(X) == predict_labels(models, X)).all()
+
+
+def test_wide_feature_space_compiles_catalog_patterns(monkeypatch, make_models):
+    monkeypatch.setattr(truth_table, "MAX_ENUMERATED_FEATURES", 4)
+    models = make_models(allergens(8), n_rows=400)
+    assert len(compile_models(models).table) == 0
+
+    catalog_X = pd.DataFrame(np.random.RandomState(4).randint(0, 2, (300, 8)), columns=list(models))
+    compiled = compile_models(models, catalog_X)
+    assert len(compiled.table) == len(np.unique(catalog_X.values, axis=0))
+
+    compiled.models = None
+    assert (compiled.predict_labels(catalog_X) == predict_labels(models, catalog_X)).all()
+
+
+def test_verify_catches_a_wrong_table_entry(make_models):
+    models = make_models(allergens(5), n_rows=400)
+    catalog_X = np.random.RandomState(6).randint(0, 2, (200, 5))
+    compiled = compile_models(models, catalog_X)
+
+    key = next(iter(compiled.table))
+    compiled.table[key] = ~compiled.table[key]
+    with pytest.raises(ValueError):
+        compiled.verify(catalog_X)
+
+
+def test_known_patterns_skip_the_forests(make_models):
+    models = make_models(allergens(5), n_rows=400)
+    compiled = CompiledModels(models).compile()
+    compiled.models = None
+    X = np.random.RandomState(5).randint(0, 2, (50, 5))
+    assert compiled.predict_labels(X).shape == (50, 5)
+
+
+def test_verify_does_not_reuse_the_compile_path(make_models):
+    models = make_models(allergens(5), n_rows=400)
+    catalog_X = np.random.RandomState(7).randint(0, 2, (200, 5))
+    compiled = CompiledModels(models)
+
+    # A broken evaluator fills the table with wrong labels; verify must still catch it
+    evaluate = compiled._evaluate
+    compiled._evaluate = lambda patterns: ~evaluate(patterns)
+    compiled.compile(catalog_X)
+    with pytest.raises(ValueError):
+        compiled.verify(catalog_X)
+
+
+def test_copy_keeps_catalog_patterns_out_of_the_original(monkeypatch, make_models):
+    monkeypatch.setattr(truth_table, "MAX_ENUMERATED_FEATURES", 4)
+    models = make_models(allergens(8), n_rows=400)
+    loaded = compile_models(models)
+
+    catalog_X = np.random.RandomState(8).randint(0, 2, (100, 8))
+    compiled = loaded.copy().compile(catalog_X)
+    assert compiled.verify(catalog_X)
+    assert len(compiled.table) > 0
+    assert len(loaded.table) == 0
@@ -3,3 +3,13 @@ from datetime import date
 def calculate_age(birthdate):
     today = date.today()
     return today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
+
+
+def parse_cooking_minutes(value):
+    # Same reading the filters have always used: the digits of the cooking time string
+    digits = "".join(filter(str.isdigit, str(value or "")))
+    return int(digits) if digits and len(digits) <= 9 else None
+
+
+def normalize_terms(values):
+    return [v.strip().lower() for v in (values or []) if v is not None]
@@ -0,0 +1,43 @@
+import os
+import json
+import base64
+import hashlib
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", 20))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 100))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_size(limit):
+    """Requested page size, defaulted and capped by the server."""
+    return min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+
+def cursor_scope(name, *parts):
+    """Scope naming an ordering and everything it depends on (filters, targets...), hashed to keep cursors short."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{name}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]}"
+
+
+def encode_cursor(key, scope=""):
+    """Opaque cursor for the last row of a page: its sort key, tagged with the ordering it belongs to."""
+    raw = json.dumps({"s": scope, "k": list(key)}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor, scope="", types=(int,)):
+    """Sort key from a cursor made by encode_cursor for the same scope; 400 on anything else."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        key = payload["k"]
+        if payload["s"] != scope or not isinstance(key, list) or len(key) != len(types):
+            raise ValueError(cursor)
+        if not all(isinstance(value, kind) for value, kind in zip(key, types)):
+            raise ValueError(cursor)
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
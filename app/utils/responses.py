@@ -0,0 +1,126 @@
+import os
+import json
+import threading
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FRAGMENT_CACHE_MAX = int(os.getenv("FRAGMENT_CACHE_MAX", 200000))
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8")
+
+
+# ---------- Meal shapes ----------
+# Plain dicts with the same fields as the response schemas, so list endpoints can skip
+# building and re-validating one Pydantic model per meal. meal_item also matches FavoriteMeal
+# and MealDetailResponse. Work on Meal rows and catalog records alike.
+
+def _ingredients_text(meal):
+    return ", ".join(meal.ingredients) if meal.ingredients else ""
+
+
+def meal_item(meal):
+    return {
+        "id": meal.id,
+        "name": meal.name,
+        "instruction": meal.instruction,
+        "calories": meal.total_calories,
+        "protein": meal.protein,
+        "carbs": meal.carbs,
+        "fats": meal.fats,
+        "origin": meal.country_origin,
+        "meal_cooking_time": meal.meal_cooking_time,
+        "difficulty": meal.meal_difficulty,
+        "diet_type": meal.diet_type,
+        "meal_type": meal.meal_type,
+        "meal_cooking_method": meal.meal_cooking_method,
+        "ingredients": _ingredients_text(meal),
+    }
+
+
+def meal_search_result(meal):
+    item = meal_item(meal)
+    del item["ingredients"]
+    return item
+
+
+# ---------- Fragment cache ----------
+
+class MealFragmentCache:
+    """Pre-encoded JSON bytes per (catalog version, shape, meal id).
+
+    Entries are only as fresh as the version they are keyed by: callers pass the catalog
+    version, which changes whenever a meal is added, removed or edited (see catalog_version),
+    and seeing a new version drops the old generation. Past max_entries, fragments are
+    encoded per request instead of stored.
+    """
+
+    def __init__(self, max_entries=FRAGMENT_CACHE_MAX):
+        self.max_entries = max_entries
+        self.version = None
+        self._fragments = {}
+        self._lock = threading.Lock()
+
+    def _generation(self, version):
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self._fragments = {}
+                    self.version = version
+        return self._fragments
+
+    def encoder(self, version, shape, render):
+        """encode(meal) -> bytes for one response shape, served from the cache when possible."""
+        fragments = self._generation(version)
+
+        def encode(meal):
+            key = (shape, meal.id)
+            fragment = fragments.get(key)
+            if fragment is None:
+                fragment = dumps(render(meal))
+                if len(fragments) < self.max_entries:
+                    fragments[key] = fragment
+            return fragment
+
+        return encode
+
+    def __len__(self):
+        return len(self._fragments)
+
+
+meal_fragments = MealFragmentCache()
+
+
+# ---------- Responses ----------
+
+def json_response(content, status_code=200, headers=None):
+    return Response(dumps(content), status_code=status_code, headers=headers, media_type="application/json")
+
+
+def _envelope_parts(envelope, key):
+    if envelope is None:
+        return b"", b""
+    # Encode the envelope with a placeholder list and split around it
+    encoded = dumps({**envelope, key: []})
+    marker = dumps(key) + b":[]"
+    split = encoded.index(marker) + len(marker) - 2
+    return encoded[:split], encoded[split + 2:]
+
+
+def json_list_response(items, render=None, headers=None, envelope=None, key=None, encode=None):
+    """JSON array of the items, optionally nested under envelope[key].
+
+    Items are encoded by encode(item) -> bytes (e.g. a MealFragmentCache encoder) or as
+    dumps(render(item)) and joined into one buffer; listings are paged, so they stay small.
+    """
+    encode = encode or (lambda item: dumps(render(item)))
+    head, tail = _envelope_parts(envelope, key)
+    body = head + b"[" + b",".join(encode(item) for item in items) + b"]" + tail
+    return Response(body, headers=headers, media_type="application/json")
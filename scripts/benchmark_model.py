@@ -0,0 +1,190 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+import datetime
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from sklearn.metrics import recall_score
+
+from app.logic.features import build_features_and_labels
+from app.logic.predictor import build_feature_matrix, predict_labels, predict_safe_meals
+from app.services.allergen_mapping import allergen_mapping_service, enhance_mapping
+from app.services.model_loader import ModelRegistry
+from app.services.safety_index import SafetyIndex
+from app.utils.allergen_csv_loader import load_allergen_mapping_from_csv
+
+# With fewer runs a p99 is just the slowest run, so it is not reported
+MIN_P99_RUNS = 100
+
+
+def synthetic_mapping(allergens, n_foods, rng):
+    # Most foods carry no allergen, a few carry one or two, like the real mapping
+    mapping = {}
+    for i in range(n_foods):
+        k = rng.choice([0, 0, 0, 1, 1, 2])
+        mapping[f"food {i}"] = list(rng.choice(allergens, k, replace=False)) if k else []
+    return mapping
+
+
+def synthetic_catalog(allergen_mapping, n_meals, rng, min_ingredients=3, max_ingredients=12):
+    foods = np.asarray(sorted(allergen_mapping))
+    return [
+        SimpleNamespace(id=i, ingredients=list(rng.choice(foods, rng.randint(min_ingredients, max_ingredients + 1))))
+        for i in range(n_meals)
+    ]
+
+
+def timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(timings, n_meals, peak_bytes):
+    p50 = float(np.percentile(timings, 50))
+    return {
+        "min_ms": float(np.min(timings)) * 1000,
+        "p50_ms": p50 * 1000,
+        "p99_ms": float(np.percentile(timings, 99)) * 1000 if len(timings) >= MIN_P99_RUNS else None,
+        "meals_per_second": n_meals / p50 if p50 else None,
+        "peak_memory_bytes": peak_bytes,
+        "runs": len(timings),
+    }
+
+
+def labeled_recall(models, compiled, allergen_mapping, labeled_csv):
+    """Per-allergen recall on hand-labeled meals, featurized the same way as scripts/test_model.py."""
+    meals_df = pd.read_csv(labeled_csv)
+    meals_df.columns = meals_df.columns.str.strip().str.lower()
+    meals_df['ingredients'] = meals_df['ingredients'].str.strip().str.lower().fillna('none')
+
+    X, _ = build_features_and_labels(meals_df['ingredients'], allergen_mapping, list(models))
+    predicted = predict_labels(models, X, compiled)
+    recall = {}
+    for i, allergen in enumerate(models):
+        y_true = meals_df['allergen'].str.contains(allergen, regex=False).fillna(False).astype(int)
+        recall[allergen] = {
+            "recall": recall_score(y_true, predicted[:, i].astype(int), zero_division=1),
+            "positives": int(y_true.sum()),
+        }
+    return recall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark allergen inference paths for accuracy and throughput.")
+    parser.add_argument("--model", required=True, help="pickled models or a model artifact directory")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="synthetic catalog sizes")
+    parser.add_argument("--allergy-sizes", type=int, nargs="+", default=[1, 3, 5], help="allergies per simulated user")
+    parser.add_argument("--repeats", type=int, default=MIN_P99_RUNS,
+                        help="timed runs per path and configuration up to --p99-max-meals")
+    parser.add_argument("--p99-max-meals", type=int, default=10000,
+                        help="larger catalogs use --large-repeats and report min/median only")
+    parser.add_argument("--large-repeats", type=int, default=5, help="timed runs per path above --p99-max-meals")
+    parser.add_argument("--baseline-max-meals", type=int, default=10000,
+                        help="skip the slow predict_safe_meals path above this catalog size")
+    parser.add_argument("--labeled-csv", default="data/testmeals.csv",
+                        help="hand-labeled meals (ingredients, allergen columns) for the recall check")
+    parser.add_argument("--mapping-csv",
+                        help="food/allergen CSV for the recall check (the allergen_mapping table is used otherwise)")
+    parser.add_argument("--no-recall", action="store_true", help="time the paths only, without the labeled recall check")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(args.seed)
+    loaded = ModelRegistry(args.model, pointer_path=None).get()
+    models, compiled = loaded.models, loaded.compiled
+    allergens = list(models)
+
+    recall = None
+    if not args.no_recall:
+        if args.mapping_csv:
+            recall_mapping = enhance_mapping(load_allergen_mapping_from_csv(args.mapping_csv))
+        else:
+            try:
+                allergen_mapping_service.refresh(force=True)
+            except Exception as e:
+                sys.exit(f"Could not load the allergen mapping for the recall check ({e}); pass --mapping-csv or --no-recall")
+            recall_mapping = allergen_mapping_service.mapping
+        recall = labeled_recall(models, compiled, recall_mapping, args.labeled_csv)
+        for allergen, stats in recall.items():
+            print(f"recall {allergen:<40} {stats['recall']:.3f}  ({stats['positives']} labeled positives)")
+
+    # Timings run on a synthetic catalog so every size is available
+    allergen_mapping = synthetic_mapping(allergens, 2000, rng)
+
+    results = {
+        "model": loaded.version,
+        "model_path": loaded.path,
+        "compiled": compiled is not None,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "recall_labeled": {"csv": args.labeled_csv, "mapping": args.mapping_csv or "allergen_mapping table", "allergens": recall}
+        if recall is not None else None,
+        "runs": [],
+    }
+
+    for n_meals in args.sizes:
+        meals = synthetic_catalog(allergen_mapping, n_meals, rng)
+        meal_ids = [meal.id for meal in meals]
+        X, _ = build_features_and_labels([meal.ingredients for meal in meals], allergen_mapping, allergens)
+
+        build_raw = timed(lambda: SafetyIndex.build(models, meal_ids, X), 1)
+        build_compiled = timed(lambda: SafetyIndex.build(models, meal_ids, X, compiled=compiled), 1) if compiled else None
+        index = SafetyIndex.build(models, meal_ids, X, compiled=compiled)
+
+        run = {
+            "meals": n_meals,
+            "index_build_ms": {"raw": build_raw[0] * 1000, "compiled": build_compiled[0] * 1000 if build_compiled else None},
+            "paths": [],
+        }
+
+        for n_allergies in args.allergy_sizes:
+            allergies = list(rng.choice(allergens, min(n_allergies, len(allergens)), replace=False))
+            user_input = {"allergies": allergies}
+
+            paths = {
+                "safety_index": lambda: index.safe_meal_ids(allergies),
+                "predict_safe_meals_precomputed_X": lambda: predict_safe_meals(models, allergen_mapping, meals, user_input, X=X),
+            }
+            if n_meals <= args.baseline_max_meals:
+                paths["predict_safe_meals"] = lambda: predict_safe_meals(models, allergen_mapping, meals, user_input)
+                paths["feature_build"] = lambda: build_feature_matrix(models, allergen_mapping, meals)
+
+            for name, fn in paths.items():
+                fn()  # warm-up
+                repeats = args.repeats if n_meals <= args.p99_max_meals else args.large_repeats
+                stats = summarize(timed(fn, repeats), n_meals, peak_memory(fn))
+                run["paths"].append({"path": name, "allergies": len(allergies), **stats})
+                p99 = f"p99 {stats['p99_ms']:9.3f}ms" if stats["p99_ms"] is not None else f"min {stats['min_ms']:9.3f}ms"
+                print(f"{n_meals:>7} meals  {len(allergies)} allergies  {name:<34} p50 {stats['p50_ms']:9.3f}ms  {p99}")
+
+        results["runs"].append(run)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
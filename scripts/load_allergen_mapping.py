@@ -6,6 +6,7 @@ import pandas as pd
 from sqlalchemy.orm import Session
 from app.core.db import SessionLocal
 from app.models.allergen_mapping import AllergenMapping
+from app.services.meal_features import sync_meal_features
 
 def load_allergens_from_csv(csv_path: str):
     df = pd.read_csv(csv_path)
@@ -20,6 +21,9 @@ def load_allergens_from_csv(csv_path: str):
             db.add(mapping)
         db.commit()
         print("Allergen mapping inserted into DB successfully.")
+        rebuilt = sync_meal_features(db)
+        db.commit()
+        print(f"Rebuilt allergen features for {rebuilt} meals.")
     except Exception as e:
         db.rollback()
         print("Failed to insert allergen mappings:", e)
@@ -6,6 +6,7 @@ import pandas as pd
 from sqlalchemy.orm import Session
 from app.core.db import SessionLocal
 from app.models.meal import Meal
+from app.services.meal_features import sync_meal_features
 
 csv_path = "data/Final_Meals_Dataset_with_Diet_Types.csv"
 df = pd.read_csv(csv_path)
@@ -38,6 +39,9 @@ try:
 
     db.commit()
     print(f"Successfully inserted {inserted} meals.")
+    rebuilt = sync_meal_features(db)
+    db.commit()
+    print(f"Rebuilt allergen features for {rebuilt} meals.")
 except Exception as e:
     db.rollback()
     print("Failed to insert meals:", e)
@@ -0,0 +1,12 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from app.services.regeneration import MEAL_SET_BATCH_SIZE, regenerate_meal_sets
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute every onboarded user's stored safe meal set, e.g. after a model or allergen mapping release.")
+    parser.add_argument("--batch-size", type=int, default=MEAL_SET_BATCH_SIZE, help="users written per multi-row upsert")
+    args = parser.parse_args()
+    print(f"Regenerated meal sets for {regenerate_meal_sets(args.batch_size)} users.")
@@ -1,66 +1,51 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import pandas as pd
 import pickle
 from sklearn.metrics import accuracy_score, classification_report
 
+from app.logic.feature_store import cache_key, load_or_build
+from app.logic.features import build_features_and_labels
+from app.services.allergen_mapping import allergen_mapping_service
+
 # Load the trained model
 model_file = 'model/trained-models/mealPredictingModel_2025-03-31_13-58-32.pkl'
 with open(model_file, 'rb') as f:
     models = pickle.load(f)
 
-# Load test meals
-new_meals_file = 'data/testmeals.csv'
-new_meals_df = pd.read_csv(new_meals_file)
-
-# Normalize columns
-new_meals_df.columns = new_meals_df.columns.str.strip().str.lower()
-new_meals_df['recipename'] = new_meals_df['recipename'].str.strip().str.lower().fillna('none')
-new_meals_df['ingredients'] = new_meals_df['ingredients'].str.strip().str.lower().fillna('none')
-new_meals_df['ingredients'] = new_meals_df['ingredients'].apply(lambda x: [ingredient.strip() for ingredient in x.split(',')])
-
-# Load allergen mapping
-allergens_file_path = 'data/finalAllergens.csv'
-allergens_df = pd.read_csv(allergens_file_path)
-allergen_mapping = allergens_df.groupby('food')['allergen'].apply(list).to_dict()
-
-# Synonyms & cross-reactions
-synonym_mapping = {
-    "groundnuts": "peanuts",
-    "peanut butter": "peanuts",
-    "dairy": "milk",
-    "seafood": "fish",
-    "prawns": "shrimp",
-}
-
-cross_reactivity_mapping = {
-    "bananas": ["latex allergy"],
-    "avocados": ["latex allergy"],
-    "shellfish": ["fish allergy"],
-}
-
-# Allergen enrichment
-def enhance_allergen_mapping(ingredient):
-    if ingredient in synonym_mapping:
-        ingredient = synonym_mapping[ingredient]
-    allergens = allergen_mapping.get(ingredient, [])
-    if ingredient in cross_reactivity_mapping:
-        allergens.extend(cross_reactivity_mapping[ingredient])
-    return allergens
+# Load allergen mapping (synonyms and cross-reactions included) from the shared service
+allergen_mapping_service.refresh(force=True)
+allergen_mapping = allergen_mapping_service.mapping
 
 # Unique allergens
-unique_allergens = set(allergen for allergens in allergen_mapping.values() for allergen in allergens)
+unique_allergens = sorted(allergen_mapping_service.allergens)
 print(f"Unique allergens: {unique_allergens}")
 
-# Convert ingredients to feature vectors
-def create_features(ingredients):
-    features = {allergen: 0 for allergen in unique_allergens}
-    for ingredient in ingredients:
-        for allergen in enhance_allergen_mapping(ingredient):
-            if allergen in features:
-                features[allergen] = 1
-    return features
+new_meals_file = 'data/testmeals.csv'
+
+def build_test_set():
+    # Load test meals
+    new_meals_df = pd.read_csv(new_meals_file)
+
+    # Normalize columns
+    new_meals_df.columns = new_meals_df.columns.str.strip().str.lower()
+    new_meals_df['ingredients'] = new_meals_df['ingredients'].str.strip().str.lower().fillna('none')
 
-# Build input matrix
-X_new = pd.DataFrame(new_meals_df['ingredients'].apply(create_features).tolist())
+    # Build input matrix with the same feature builder as training and serving
+    X_new, _ = build_features_and_labels(new_meals_df['ingredients'], allergen_mapping, unique_allergens)
+
+    # True labels from the CSV
+    y_true = pd.DataFrame({
+        allergen: new_meals_df['allergen'].str.contains(allergen).fillna(False).astype(int)
+        for allergen in unique_allergens
+    })
+    return {"X": X_new, "y": y_true}
+
+# Featurized test set, reused from the feature store while the CSV and mapping are unchanged
+test_set = load_or_build(cache_key([new_meals_file], allergen_mapping, unique_allergens, namespace="evaluation"), build_test_set)
+X_new, y_true = test_set["X"], test_set["y"]
 
 # Align columns with model features
 for column in models[list(models.keys())[0]]["features"]:
@@ -69,17 +54,6 @@ for column in models[list(models.keys())[0]]["features"]:
 
 X_new = X_new[models[list(models.keys())[0]]["features"]]
 
-# True labels from the CSV
-y_true = pd.DataFrame({
-    allergen: new_meals_df['allergen'].str.contains(allergen).fillna(False).astype(int)
-    for allergen in unique_allergens
-})
-
-# Fill any missing columns
-for allergen in unique_allergens:
-    if allergen not in y_true.columns:
-        y_true[allergen] = 0
-
 # Predict and evaluate
 y_pred = {}
 accuracy = {}
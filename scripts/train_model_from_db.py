@@ -1,91 +1,27 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import train_test_split, GridSearchCV, HalvingGridSearchCV, KFold, RandomizedSearchCV, StratifiedKFold
 from sklearn.metrics import accuracy_score, classification_report, precision_score, recall_score, f1_score
 from imblearn.over_sampling import SMOTE
 import pickle
 import datetime
 
-# Load the datasets from CSV files
-food_allergens_df = pd.read_csv('scripts/finalAllergens.csv')
-meals_df = pd.read_csv('scripts/finalMeals.csv')
-
-# Clean column names by stripping whitespace and making them lowercase
-food_allergens_df.columns = food_allergens_df.columns.str.strip().str.lower()
-meals_df.columns = meals_df.columns.str.strip().str.lower()
-
-# Cleanse the 'food' and 'allergen' columns in food_allergens_df
-food_allergens_df['food'] = food_allergens_df['food'].str.strip().str.lower().fillna('none')
-food_allergens_df['allergen'] = food_allergens_df['allergen'].str.strip().str.lower().fillna('none')
-
-# Cleanse the 'recipename' and 'ingredients' columns in meals_df
-meals_df['recipename'] = meals_df['recipename'].str.strip().str.lower().fillna('none')
-meals_df['ingredients'] = meals_df['ingredients'].str.strip().str.lower().fillna('none')
-
-# Split ingredients in meals to create a list for each recipe
-meals_df['ingredients'] = meals_df['ingredients'].apply(lambda x: [ingredient.strip() for ingredient in x.split(',')])
-
-# Synonym Mapping (Extend this list for more ingredient synonyms)
-synonym_mapping = {
-    "groundnuts": "peanuts",
-    "peanut butter": "peanuts",
-    "dairy": "milk",
-    "seafood": "fish",
-    "prawns": "shrimp",
-    # Add more synonyms here
-}
-
-# Add cross-reactivity mapping for specific allergens (e.g., latex-fruit syndrome)
-cross_reactivity_mapping = {
-    "bananas": ["latex allergy"],
-    "avocados": ["latex allergy"],
-    "shellfish": ["fish allergy"],
-    # Add more cross-reactive foods and allergens here
-}
+from app.logic.compression import DEFAULT_FPR_TOLERANCE, DEFAULT_RECALL_TOLERANCE, compress_models
+from app.logic.feature_store import cache_key, load_or_build
+from app.logic.features import build_features_and_labels
+from app.logic.forest_artifact import export_models
+from app.logic.multilabel import MULTI_LABEL_LAYOUT, MultiLabelModels
+from app.services.allergen_mapping import allergen_mapping_service
 
-# Update Allergen Mapping Function to include synonyms and cross-reactivity
-def enhance_allergen_mapping(ingredient):
-    # Check if the ingredient has a synonym
-    if ingredient in synonym_mapping:
-        ingredient = synonym_mapping[ingredient]
-    
-    allergens = allergen_mapping.get(ingredient, [])
-    
-    # Add cross-reactivity allergens
-    if ingredient in cross_reactivity_mapping:
-        allergens.extend(cross_reactivity_mapping[ingredient])
-    
-    return allergens
-
-# Create a dictionary for allergen mapping (with enhancements)
-allergen_mapping = food_allergens_df.groupby('food')['allergen'].apply(list).to_dict()
-
-# Create a unique list of allergens
-unique_allergens = set(allergen for allergens in allergen_mapping.values() for allergen in allergens)
-
-# Prepare the data for Random Forest
-def create_features(ingredients):
-    features = {allergen: 0 for allergen in unique_allergens}
-    for ingredient in ingredients:
-        # Apply synonym and cross-reactivity enhancements
-        enhanced_allergens = enhance_allergen_mapping(ingredient)
-        for allergen in enhanced_allergens:
-            if allergen in features:
-                features[allergen] = 1
-    return features
-
-# Create feature and target matrices
-X = pd.DataFrame(meals_df['ingredients'].apply(create_features).tolist())
-
-# Now, create the true label columns in meals_df based on allergens
-for allergen in unique_allergens:
-    meals_df[allergen] = meals_df['ingredients'].apply(lambda ingredients: any([allergen in enhance_allergen_mapping(ingredient) for ingredient in ingredients]))
-
-# Set y as the allergen columns for training
-y = meals_df[list(unique_allergens)]
-
-# Perform k-fold cross-validation
-kfold = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+CHECKPOINT_ROOT = "model/checkpoints"
 
 # Define hyperparameter grid for tuning
 param_grid = {
@@ -96,69 +32,244 @@ param_grid = {
     'bootstrap': [True, False],       # Whether to use bootstrap samples when building trees
 }
 
-# Train Random Forest models for each allergen using GridSearchCV
-models = {}
-best_params = {}
-accuracy = {}
-y_pred = {}
 
-# Train-Test Split for Accuracy Evaluation
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+def load_training_data(meals_csv='scripts/finalMeals.csv', use_cache=True):
+    # Same mapping service as serving: synonyms and cross-reactivity are already folded in
+    allergen_mapping_service.refresh(force=True)
+    allergen_mapping = allergen_mapping_service.mapping
+
+    # Create a unique list of allergens
+    unique_allergens = allergen_mapping_service.allergens
+
+    def build():
+        # Load the meals dataset; the allergen mapping comes from the allergen_mapping table
+        meals_df = pd.read_csv(meals_csv)
+
+        # Clean column names by stripping whitespace and making them lowercase
+        meals_df.columns = meals_df.columns.str.strip().str.lower()
+
+        # Cleanse the 'ingredients' column in meals_df
+        meals_df['ingredients'] = meals_df['ingredients'].str.strip().str.lower().fillna('none')
+
+        # Feature and label matrices for every allergen in one pass over the exploded ingredients
+        X, y = build_features_and_labels(meals_df['ingredients'], allergen_mapping, unique_allergens)
+        return {"X": X, "y": y}
+
+    # Reuse the featurized matrices while the CSV and the mapping content are unchanged
+    if use_cache:
+        frames = load_or_build(cache_key([meals_csv], allergen_mapping, unique_allergens, namespace="training"), build)
+    else:
+        frames = build()
+    return frames["X"], frames["y"], unique_allergens
+
+
+def make_search(search, n_jobs, n_iter, multi_label=False):
+    clf = RandomForestClassifier(random_state=42, class_weight='balanced')
+    # Perform k-fold cross-validation (stratification is undefined for multi-label targets)
+    if multi_label:
+        kfold = KFold(n_splits=5, shuffle=True, random_state=42)
+    else:
+        kfold = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+
+    if search == "halving":
+        return HalvingGridSearchCV(estimator=clf, param_grid=param_grid, cv=kfold, factor=3, n_jobs=n_jobs, random_state=42, verbose=1)
+    if search == "random":
+        return RandomizedSearchCV(estimator=clf, param_distributions=param_grid, n_iter=n_iter, cv=kfold, n_jobs=n_jobs, random_state=42, verbose=1)
+    return GridSearchCV(estimator=clf, param_grid=param_grid, cv=kfold, n_jobs=n_jobs, verbose=2)
+
 
-# Loop over each allergen to apply SMOTE and train models
-for allergen in unique_allergens:
+def train_allergen(allergen, X_train, y_train, X_test, y_test, search="grid", n_jobs=-1, n_iter=30):
     print(f"Training for allergen: {allergen}")
-    
+
     # Check the number of samples for the current allergen
-    num_samples = y_train[allergen].sum()
-    
+    num_samples = y_train.sum()
+
     if num_samples > 1:
         # Adjust SMOTE n_neighbors dynamically based on the number of samples
         n_neighbors = min(5, num_samples - 1)  # Ensure n_neighbors is not greater than the number of samples - 1
         smote = SMOTE(random_state=42, k_neighbors=n_neighbors)
-        X_train_res, y_train_res = smote.fit_resample(X_train, y_train[allergen])
+        X_train_res, y_train_res = smote.fit_resample(X_train, y_train)
     else:
         # If too few samples, skip SMOTE and use original data
-        X_train_res, y_train_res = X_train, y_train[allergen]
+        X_train_res, y_train_res = X_train, y_train
 
     # Train the RandomForestClassifier
-    clf = RandomForestClassifier(random_state=42, class_weight='balanced')
-    grid_search = GridSearchCV(estimator=clf, param_grid=param_grid, cv=kfold, n_jobs=-1, verbose=2)
+    grid_search = make_search(search, n_jobs, n_iter)
     grid_search.fit(X_train_res, y_train_res)
-    
     best_clf = grid_search.best_estimator_
-    models[allergen] = best_clf
-    best_params[allergen] = grid_search.best_params_
 
     # Predict on the test set with adjusted threshold for sensitivity
     y_pred_prob = best_clf.predict_proba(X_test)
-    
+
     if y_pred_prob.shape[1] == 2:
-        y_pred[allergen] = (y_pred_prob[:, 1] >= 0.4).astype(int)  # Probability of class 1
+        y_pred = (y_pred_prob[:, 1] >= 0.4).astype(int)  # Probability of class 1
     else:
-        y_pred[allergen] = (y_pred_prob[:, 0] < 0.6).astype(int)  # Adjust threshold for binary classification
+        y_pred = (y_pred_prob[:, 0] < 0.6).astype(int)  # Adjust threshold for binary classification
 
     # Evaluate model accuracy, precision, recall, and F1-score
-    accuracy[allergen] = accuracy_score(y_test[allergen], y_pred[allergen])
-    precision = precision_score(y_test[allergen], y_pred[allergen], zero_division=1)
-    recall = recall_score(y_test[allergen], y_pred[allergen], zero_division=1)
-    f1 = f1_score(y_test[allergen], y_pred[allergen], zero_division=1)
-    
-    print(f"Model accuracy for {allergen}: {accuracy[allergen]:.2f}")
-    print(f"Precision for {allergen}: {precision:.2f}")
-    print(f"Recall for {allergen}: {recall:.2f}")
-    print(f"F1-score for {allergen}: {f1:.2f}")
-    print(f"Best parameters for {allergen}: {best_params[allergen]}")
-
-# Calculate overall accuracy for all allergens
-overall_accuracy = sum(accuracy.values()) / len(accuracy)
-print(f"\nOverall model accuracy: {overall_accuracy * 100:.2f}%")
-
-# Get the current date and time for naming the model file
-current_date = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-
-# Save the trained models with a dynamic name based on the current date and time
-model_filename = f"model/trained-models/mealPredictingModel_{current_date}.pkl"
-with open(model_filename, 'wb') as model_file:
-    pickle.dump(models, model_file)
-print(f"Model saved as '{model_filename}'")
+    metrics = {
+        "accuracy": accuracy_score(y_test, y_pred),
+        "precision": precision_score(y_test, y_pred, zero_division=1),
+        "recall": recall_score(y_test, y_pred, zero_division=1),
+        "f1": f1_score(y_test, y_pred, zero_division=1),
+    }
+    return {"model": best_clf, "best_params": grid_search.best_params_, "metrics": metrics}
+
+
+def train_multi_label(X_train, y_train, X_test, y_test, search="grid", n_jobs=-1, n_iter=30):
+    print(f"Training one multi-label forest for {y_train.shape[1]} allergens")
+
+    # SMOTE has no multi-label mode; class_weight='balanced' is applied per output instead
+    grid_search = make_search(search, n_jobs, n_iter, multi_label=True)
+    grid_search.fit(X_train, y_train)
+    best_clf = grid_search.best_estimator_
+    y_pred = best_clf.predict(X_test)
+
+    results = {}
+    for i, allergen in enumerate(y_train.columns):
+        y_true = y_test[allergen].astype(int)
+        y_hat = y_pred[:, i].astype(int)
+        results[allergen] = {
+            "best_params": grid_search.best_params_,
+            "metrics": {
+                "accuracy": accuracy_score(y_true, y_hat),
+                "precision": precision_score(y_true, y_hat, zero_division=1),
+                "recall": recall_score(y_true, y_hat, zero_division=1),
+                "f1": f1_score(y_true, y_hat, zero_division=1),
+            }
+        }
+    return MultiLabelModels(best_clf, list(y_train.columns)), results
+
+
+def checkpoint_path(run_dir, allergen):
+    return os.path.join(run_dir, allergen.replace("/", "_").replace(" ", "_") + ".pkl")
+
+
+def save_checkpoint(run_dir, allergen, result):
+    path = checkpoint_path(run_dir, allergen)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({"allergen": allergen, **result}, f)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoints(run_dir, allergens):
+    results = {}
+    for allergen in allergens:
+        path = checkpoint_path(run_dir, allergen)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                results[allergen] = pickle.load(f)
+    return results
+
+
+def report(allergen, result):
+    metrics = result["metrics"]
+    print(f"Model accuracy for {allergen}: {metrics['accuracy']:.2f}")
+    print(f"Precision for {allergen}: {metrics['precision']:.2f}")
+    print(f"Recall for {allergen}: {metrics['recall']:.2f}")
+    print(f"F1-score for {allergen}: {metrics['f1']:.2f}")
+    print(f"Best parameters for {allergen}: {result['best_params']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train one RandomForest per allergen, checkpointing each finished model.")
+    parser.add_argument("--search", choices=["grid", "halving", "random"], default="grid",
+                        help="hyperparameter search: full grid, successive halving, or randomized")
+    parser.add_argument("--n-iter", type=int, default=30, help="candidates sampled by --search random")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="allergens trained in parallel")
+    parser.add_argument("--resume", metavar="RUN_ID", help="continue a previous run from its checkpoints")
+    parser.add_argument("--multi-label", action="store_true",
+                        help="train a single multi-output forest for all allergens instead of one per allergen")
+    parser.add_argument("--compress", action="store_true",
+                        help="prune/distill the trained forests, guarded by held-out recall and false-positive rate")
+    parser.add_argument("--recall-tolerance", type=float, default=DEFAULT_RECALL_TOLERANCE,
+                        help="maximum recall drop accepted by --compress")
+    parser.add_argument("--fpr-tolerance", type=float, default=DEFAULT_FPR_TOLERANCE,
+                        help="maximum false-positive rate increase accepted by --compress")
+    parser.add_argument("--no-feature-cache", action="store_true", help="rebuild features instead of using the feature store")
+    args = parser.parse_args()
+    if args.multi_label and args.search == "halving":
+        parser.error("--search halving does not support multi-label targets; use grid or random")
+    if args.multi_label and args.resume:
+        parser.error("--resume needs per-allergen checkpoints, which --multi-label does not write")
+
+    # Get the current date and time for naming the run and the model file
+    run_id = args.resume or datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    run_dir = os.path.join(CHECKPOINT_ROOT, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+
+    X, y, unique_allergens = load_training_data(use_cache=not args.no_feature_cache)
+
+    # Train-Test Split for Accuracy Evaluation
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    if args.multi_label:
+        models, results = train_multi_label(X_train, y_train, X_test, y_test, args.search, -1, args.n_iter)
+        for allergen in unique_allergens:
+            report(allergen, results[allergen])
+    else:
+        results = load_checkpoints(run_dir, unique_allergens)
+        if results:
+            print(f"Resuming run {run_id}: {len(results)} of {len(unique_allergens)} allergens already trained")
+
+        pending = [allergen for allergen in unique_allergens if allergen not in results]
+        # Parallelism goes across allergens; keep each search single-process to avoid oversubscription
+        search_jobs = 1 if args.workers > 1 else -1
+
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = {
+                pool.submit(train_allergen, allergen, X_train, y_train[allergen], X_test, y_test[allergen],
+                            args.search, search_jobs, args.n_iter): allergen
+                for allergen in pending
+            }
+            for future in as_completed(futures):
+                allergen = futures[future]
+                results[allergen] = future.result()
+                save_checkpoint(run_dir, allergen, results[allergen])
+                report(allergen, results[allergen])
+
+        # Keep the feature column order for the artifact
+        models = {allergen: results[allergen]["model"] for allergen in unique_allergens}
+
+    # Calculate overall accuracy for all allergens
+    accuracy = {allergen: results[allergen]["metrics"]["accuracy"] for allergen in unique_allergens}
+    overall_accuracy = sum(accuracy.values()) / len(accuracy)
+    print(f"\nOverall model accuracy: {overall_accuracy * 100:.2f}%")
+
+    # Shrink the forests, accepting a smaller model only while recall and false positives stay within
+    # tolerance; candidates are chosen on one half of the held-out split and reported on the other
+    if args.compress:
+        X_val, X_report, y_val, y_report = train_test_split(X_test, y_test, test_size=0.5, random_state=42)
+        models, compression = compress_models(
+            models, X_train, X_val, y_val, X_report, y_report, args.recall_tolerance, args.fpr_tolerance
+        )
+        for name, stats in compression.items():
+            print(
+                f"Compression for {name}: {stats['method']}, "
+                f"size {stats['size_before'] / 1024:.0f}KB -> {stats['size_after'] / 1024:.0f}KB, "
+                f"latency {stats['latency_per_row_before'] * 1e6:.1f}us -> {stats['latency_per_row_after'] * 1e6:.1f}us per row, "
+                f"recall {stats['recall_before']:.3f} -> {stats['recall_after']:.3f}, "
+                f"false-positive rate {stats['false_positive_rate_before']:.3f} -> {stats['false_positive_rate_after']:.3f}"
+            )
+        with open(f"model/trained-models/mealPredictingModel_{run_id}_compression.json", "w") as f:
+            json.dump(compression, f, indent=2)
+
+    if isinstance(models, MultiLabelModels):
+        payload = {"layout": MULTI_LABEL_LAYOUT, "allergens": models.allergens, "model": models.estimator}
+    else:
+        payload = models
+
+    # Save the trained models with a dynamic name based on the run id
+    model_filename = f"model/trained-models/mealPredictingModel_{run_id}.pkl"
+    with open(model_filename, 'wb') as model_file:
+        pickle.dump(payload, model_file)
+    print(f"Model saved as '{model_filename}'")
+
+    # Export the memory-mappable artifact served by the model registry (point model/trained-models/CURRENT at it)
+    artifact_dir = export_models(models, f"model/trained-models/mealPredictingModel_{run_id}", version=f"mealPredictingModel_{run_id}")
+    print(f"Model artifact exported to '{artifact_dir}'")
+
+
+if __name__ == "__main__":
+    main()